@@ -1,30 +1,58 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-import json
 import time
 import logging
+import queue
+import subprocess
+import sys
 from pathlib import Path
 
-# --- Naplózás beállítása ---
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('video_compressor.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+from video_compressor.autotune import AutoProfileCache, AutoTuner
+from video_compressor.batch import make_job
+from video_compressor.decision import ACTION_LABELS
+from video_compressor.eta import EtaEstimator, SpeedHistory
+from video_compressor.file_scanner import FileScanner
+from video_compressor.fingerprint import FingerprintIndex
+from video_compressor.journal import JobJournal, recover_journal
+from video_compressor.log_setup import LOG_LEVELS, configure_logging, set_log_level
+from video_compressor.metadata import MetadataCache, MetadataScanner
+from video_compressor.preview import PreviewCache, PreviewGenerator
+from video_compressor.profiles import PROFILES
+from video_compressor.reports import ReportWriter, enabled_formats, format_hms
+from video_compressor.timestamps import TimestampIndex, format_time, parse_time
+from video_compressor.timing import STAGE_PROBE, STAGE_REPORT, STAGE_SCAN, SpanRecorder
+from video_compressor.work_share import SharedJobQueue, write_merged_report
+from video_compressor.scheduler import (
+    JobScheduler, ORDER_CHRONOLOGICAL, ORDER_SIZE, STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED, STATUS_CANCELLED,
+    STATUS_LABELS, EVENT_JOB_STARTED, EVENT_JOB_FINISHED, EVENT_BATCH_FINISHED
 )
+from video_compressor.settings import (
+    SETTINGS_FILE, METADATA_CACHE_FILE, SPEED_HISTORY_FILE, JOURNAL_FILE, AUTO_PROFILE_CACHE_FILE, PREVIEW_CACHE_DIR,
+    load_settings, save_settings as write_settings
+)
+
+# --- Naplózás beállítása (forgó naplófájl, nem blokkoló sor; a szint a mentett beállításokból) ---
+configure_logging()
 logger = logging.getLogger(__name__)
+try:
+    if os.path.exists(SETTINGS_FILE):
+        set_log_level(load_settings(SETTINGS_FILE)["log_level"])
+except Exception as e:
+    logger.error(f"Hiba a naplózási szint beállításakor: {e}")
 
 # --- Konstansok ---
-SETTINGS_FILE = "settings.json"
 SCRIPT_NAME = os.path.basename(__file__)
-PROFILES = {
-    "Alacsony": {"crf": "28", "preset": "fast"},
-    "Közepes": {"crf": "23", "preset": "medium"},
-    "Magas": {"crf": "18", "preset": "slow"}
-}
+SCHEDULER_POLL_MS = 200
+PROGRESS_REFRESH_SEC = 0.5
+ETA_REFRESH_SEC = 5
+METADATA_POLL_MS = 100
+METADATA_EVENTS_PER_TICK = 2000
+FILE_LOAD_POLL_MS = 50
+FILE_LOAD_ROWS_PER_TICK = 2000
+PREVIEW_POLL_MS = 250
+# Kilépéskor legfeljebb ennyit vár a megszakított kódolások leállására
+EXIT_CANCEL_WAIT_SEC = 30
 
 # --- Globális változók ---
 root = tk.Tk()
@@ -34,24 +62,66 @@ output_dir_path = ""
 log_output_dir_path = ""
 ffmpeg_path = "ffmpeg"
 ffprobe_path = "ffprobe"
+# Közös feladatsor gépazonosító; a GUI-n nem szerkeszthető, de mentéskor megmarad
+node_id = ""
 selected_profile = PROFILES[list(PROFILES.keys())[0]] if PROFILES else {}
 program_start_time = None
+session_start_time = None
+scheduler = None
+scheduler_events = queue.Queue()
+last_progress_refresh = 0.0
+speed_history = None
+eta_estimator = None
+last_eta_refresh = 0.0
+session_state = {}
+job_journal = None
+fingerprint_index = None
+report_writer = None
+timings = None
+shared_queue = None
+preview_generator = None
+preview_events = queue.Queue()
+preview_open_requested = set()
+preview_polling = False
+metadata_cache = None
+metadata_scanner = None
+metadata_events = queue.Queue()
+metadata_received = 0
+file_metadata = {}
+timestamp_index = None
+# A "Kijelölés" gombbal kijelölt sorok; csak ilyenkor szűkül a feldolgozás (a véletlen kijelölés nem számít)
+range_selection = None
+file_scanner = None
+file_load_events = queue.Queue()
+loaded_items = []
 
 # --- Tkinter változók ---
 input_dir_path_var = tk.StringVar(root)
 output_dir_path_var = tk.StringVar(root)
 log_output_dir_path_var = tk.StringVar(root)
+scratch_dir_path_var = tk.StringVar(root)
+shared_queue_dir_path_var = tk.StringVar(root)
 ffmpeg_path_var = tk.StringVar(root, value="ffmpeg")
 ffprobe_path_var = tk.StringVar(root, value="ffprobe")
 selected_profile_name_var = tk.StringVar(root)
 if PROFILES:
     selected_profile_name_var.set(list(PROFILES.keys())[0])
 num_threads_var = tk.IntVar(root, value=1)
+auto_threads_var = tk.BooleanVar(root, value=False)
+pin_cpus_var = tk.BooleanVar(root, value=False)
+segment_mode_var = tk.BooleanVar(root, value=False)
+segment_threshold_var = tk.IntVar(root, value=60)
+passthrough_mode_var = tk.StringVar(root, value="off")
 excel_log_var = tk.BooleanVar(root, value=True)
 pdf_log_var = tk.BooleanVar(root, value=False)
 txt_log_var = tk.BooleanVar(root, value=True)
 json_log_var = tk.BooleanVar(root, value=True)
 file_type_var = tk.StringVar(root, value="ch")
+log_level_var = tk.StringVar(root, value="INFO")
+chronological_order_var = tk.BooleanVar(root, value=False)
+range_from_var = tk.StringVar(root)
+range_to_var = tk.StringVar(root)
+channel_filter_var = tk.StringVar(root)
 progress_var = tk.DoubleVar(root)
 
 # --- GUI elemek globális változói ---
@@ -81,50 +151,45 @@ processing_completed_label = None
 
 # --- Beállítások betöltése ---
 def load_app_settings():
-    global selected_profile, ffmpeg_path, ffprobe_path, input_dir_path, output_dir_path, log_output_dir_path
+    global selected_profile, ffmpeg_path, ffprobe_path, input_dir_path, output_dir_path, log_output_dir_path, node_id
     logger.debug("Beállítások betöltése elkezdődött")
     try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                settings = json.load(f)
-
-            input_dir_path_var.set(settings.get("input_dir", ""))
-            output_dir_path_var.set(settings.get("output_dir", ""))
-            log_output_dir_path_var.set(settings.get("log_output_dir", ""))
-            input_dir_path = input_dir_path_var.get()
-            output_dir_path = output_dir_path_var.get()
-            log_output_dir_path = log_output_dir_path_var.get()
-
-            profile_name = settings.get("selected_profile_name")
-            if profile_name and profile_name in PROFILES:
-                selected_profile_name_var.set(profile_name)
-                selected_profile = PROFILES[profile_name]
-            else:
-                if PROFILES:
-                    selected_profile_name_var.set(list(PROFILES.keys())[0])
-                    selected_profile = PROFILES[selected_profile_name_var.get()]
-
-            num_threads_var.set(settings.get("num_threads", 1))
-            excel_log_var.set(settings.get("excel_log", True))
-            pdf_log_var.set(settings.get("pdf_log", False))
-            txt_log_var.set(settings.get("txt_log", True))
-            json_log_var.set(settings.get("json_log", True))
-            file_type_var.set(settings.get("file_type_choice", "ch"))
-
-            ffmpeg_path = settings.get("ffmpeg_path", "ffmpeg")
-            ffprobe_path = settings.get("ffprobe_path", "ffprobe")
-            ffmpeg_path_var.set(ffmpeg_path)
-            ffprobe_path_var.set(ffprobe_path)
-
-            logger.info("Beállítások sikeresen betöltve")
-        else:
-            logger.warning("Nincs mentett beállításfájl, alapértelmezett értékek használata")
-            input_dir_path_var.set("")
-            output_dir_path_var.set("")
-            log_output_dir_path_var.set("")
-            input_dir_path = ""
-            output_dir_path = ""
-            log_output_dir_path = ""
+        settings = load_settings(SETTINGS_FILE)
+
+        input_dir_path_var.set(settings["input_dir"])
+        output_dir_path_var.set(settings["output_dir"])
+        log_output_dir_path_var.set(settings["log_output_dir"])
+        scratch_dir_path_var.set(settings["scratch_dir"])
+        shared_queue_dir_path_var.set(settings["shared_queue_dir"])
+        input_dir_path = input_dir_path_var.get()
+        output_dir_path = output_dir_path_var.get()
+        log_output_dir_path = log_output_dir_path_var.get()
+
+        if settings["selected_profile_name"]:
+            selected_profile_name_var.set(settings["selected_profile_name"])
+            selected_profile = PROFILES[selected_profile_name_var.get()]
+
+        num_threads_var.set(settings["num_threads"])
+        auto_threads_var.set(settings["auto_threads"])
+        pin_cpus_var.set(settings["pin_cpus"])
+        segment_mode_var.set(settings["segment_mode"])
+        segment_threshold_var.set(settings["segment_threshold_min"])
+        passthrough_mode_var.set(settings["passthrough_mode"])
+        excel_log_var.set(settings["excel_log"])
+        pdf_log_var.set(settings["pdf_log"])
+        txt_log_var.set(settings["txt_log"])
+        json_log_var.set(settings["json_log"])
+        file_type_var.set(settings["file_type_choice"])
+        log_level_var.set(settings["log_level"])
+        chronological_order_var.set(settings["chronological_order"])
+
+        ffmpeg_path = settings["ffmpeg_path"]
+        ffprobe_path = settings["ffprobe_path"]
+        ffmpeg_path_var.set(ffmpeg_path)
+        ffprobe_path_var.set(ffprobe_path)
+        node_id = settings["node_id"]
+
+        logger.info("Beállítások sikeresen betöltve")
     except Exception as e:
         logger.error(f"Hiba a beállítások betöltésekor: {e}")
         input_dir_path_var.set("")
@@ -136,11 +201,13 @@ def load_app_settings():
 
 # --- Munkamenet állapot betöltése ---
 def load_session_state():
+    global session_state
     logger.debug("Munkamenet állapot betöltése elkezdődött")
     try:
-        # Placeholder: Munkamenet állapot betöltése (pl. Treeview adatok)
+        # A feladatnapló visszajátszása; a félkész kimenetek törlődnek, a fájlok újra sorra kerülnek
+        session_state = recover_journal(JOURNAL_FILE)
         logger.info("Munkamenet állapot sikeresen betöltve")
-        return False  # Visszaadja, hogy folytatódott-e a munkamenet
+        return any(record["state"] != STATUS_DONE for record in session_state.values())
     except Exception as e:
         logger.error(f"Hiba a munkamenet állapot betöltésekor: {e}")
         return False
@@ -153,18 +220,27 @@ def save_settings():
             "input_dir": input_dir_path_var.get(),
             "output_dir": output_dir_path_var.get(),
             "log_output_dir": log_output_dir_path_var.get(),
+            "scratch_dir": scratch_dir_path_var.get(),
+            "shared_queue_dir": shared_queue_dir_path_var.get(),
+            "node_id": node_id,
             "selected_profile_name": selected_profile_name_var.get(),
             "num_threads": num_threads_var.get(),
+            "auto_threads": auto_threads_var.get(),
+            "pin_cpus": pin_cpus_var.get(),
+            "segment_mode": segment_mode_var.get(),
+            "segment_threshold_min": segment_threshold_var.get(),
+            "passthrough_mode": passthrough_mode_var.get(),
             "excel_log": excel_log_var.get(),
             "pdf_log": pdf_log_var.get(),
             "txt_log": txt_log_var.get(),
             "json_log": json_log_var.get(),
             "file_type_choice": file_type_var.get(),
+            "log_level": log_level_var.get(),
+            "chronological_order": chronological_order_var.get(),
             "ffmpeg_path": ffmpeg_path_var.get(),
             "ffprobe_path": ffprobe_path_var.get()
         }
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(settings, f, indent=4)
+        write_settings(settings, SETTINGS_FILE)
         logger.info("Beállítások sikeresen mentve")
     except Exception as e:
         logger.error(f"Hiba a beállítások mentésekor: {e}")
@@ -191,6 +267,60 @@ def select_log_output_dir():
         save_settings()
         logger.info(f"Napló mappa kiválasztva: {folder}")
 
+def select_scratch_dir():
+    folder = filedialog.askdirectory()
+    if folder:
+        scratch_dir_path_var.set(folder)
+        save_settings()
+        logger.info(f"Átmeneti mappa kiválasztva: {folder}")
+
+def select_shared_queue_dir():
+    folder = filedialog.askdirectory()
+    if folder:
+        shared_queue_dir_path_var.set(folder)
+        save_settings()
+        logger.info(f"Közös feladatsor mappa kiválasztva: {folder}")
+
+# --- Közös feladatsor: összesített állapot és jelentés az összes gép eredményeiből ---
+def open_shared_queue():
+    if not shared_queue_dir_path_var.get():
+        return None
+    return SharedJobQueue(shared_queue_dir_path_var.get(), input_dir_path_var.get() or ".",
+                          node_id=node_id or None)
+
+def show_shared_queue_status():
+    try:
+        queue_view = shared_queue or open_shared_queue()
+        if queue_view is None:
+            messagebox.showinfo("Információ", "Nincs közös feladatsor mappa megadva.")
+            return
+        status = queue_view.status()
+        lines = ["Kész (összes gép): " + (", ".join(f"{STATUS_LABELS.get(key, key)}: {count}"
+                                                     for key, count in status["results"].items()) or "-")]
+        for node, counts in sorted(status["nodes"].items(), key=lambda item: str(item[0])):
+            lines.append(f"{node}: " + ", ".join(f"{STATUS_LABELS.get(key, key)}: {count}" for key, count in counts.items()))
+        for claim in status["claims"][:20]:
+            lines.append(f"Fut: {claim['input']} ({claim['node']}{', lejárt' if claim['stale'] else ''})")
+        messagebox.showinfo("Közös feladatsor", "\n".join(lines))
+    except Exception as e:
+        logger.error(f"Hiba a közös feladatsor állapotának lekérdezésekor: {e}")
+
+def write_shared_report():
+    try:
+        queue_view = shared_queue or open_shared_queue()
+        directory = log_output_dir_path_var.get() or output_dir_path_var.get()
+        formats = enabled_formats({"excel_log": excel_log_var.get(), "pdf_log": pdf_log_var.get(),
+                                   "txt_log": txt_log_var.get(), "json_log": json_log_var.get()})
+        if queue_view is None or not directory or not formats:
+            messagebox.showinfo("Információ", "Közös feladatsor mappa, kimeneti mappa és napló formátum szükséges.")
+            return
+        writer = ReportWriter(directory, formats, name=time.strftime("tomorites_osszesitett_%Y%m%d_%H%M%S"))
+        rows = write_merged_report(queue_view, writer, STATUS_LABELS)
+        writer.close({"Fájlok": rows})
+        status_label.config(text=f"Összesített jelentés elkészült: {rows} sor")
+    except Exception as e:
+        logger.error(f"Hiba az összesített jelentés készítésekor: {e}")
+
 # --- FFmpeg/FFprobe útvonal beállítása ---
 def set_ffmpeg_paths():
     ffmpeg_file = filedialog.askopenfilename(title="FFmpeg kiválasztása")
@@ -214,6 +344,7 @@ def update_selected_profile_and_save_settings(*args):
 
 # --- Fájlok betöltése a Treeview-ba ---
 def load_files_to_treeview():
+    global file_scanner, timings
     logger.debug("Fájlok betöltése a Treeview-ba elkezdődött")
     try:
         input_dir = input_dir_path_var.get()
@@ -221,35 +352,595 @@ def load_files_to_treeview():
             messagebox.showerror("Hiba", "Érvénytelen bemeneti mappa!")
             logger.error("Érvénytelen bemeneti mappa megadva")
             return
-        # Placeholder: Fájlok betöltése (pl. os.listdir használata)
-        for item in tree.get_children():
-            tree.delete(item)
-        # Példa fájlok hozzáadása
-        for i, filename in enumerate(os.listdir(input_dir), 1):
-            tree.insert("", "end", values=(i, filename, "-", "-", "-", "-", "-", "-", "-", "-", "-", "-", "-", "Készenlét", "-"))
-        logger.info(f"Fájlok betöltve a Treeview-ba: {input_dir}")
+        cancel_file_load()
+        cancel_metadata_scan()
+        clear_tree()
+        # Az időmérés a betöltéstől a köteg végéig tart
+        timings = SpanRecorder()
+        # A bejárás háttérszálon fut, a sorok kötegekben érkeznek a Tk szálra
+        scanner = FileScanner(input_dir, on_batch=lambda batch: file_load_events.put((scanner, "batch", batch)),
+                              on_done=lambda error: file_load_events.put((scanner, "done", error)),
+                              index=get_fingerprint_index())
+        file_scanner = scanner
+        loading_status_label.config(text="Fájlok betöltése...")
+        scanner.start()
+        root.after(FILE_LOAD_POLL_MS, poll_file_load_events, scanner, [])
     except Exception as e:
         logger.error(f"Hiba a fájlok betöltésekor: {e}")
         messagebox.showerror("Hiba", f"Hiba a fájlok betöltésekor: {e}")
 
+def poll_file_load_events(scanner, backlog):
+    if scanner is not file_scanner:
+        return
+    finished = False
+    error = None
+    try:
+        while True:
+            source, kind, payload = file_load_events.get_nowait()
+            if source is not scanner:
+                continue
+            if kind == "batch":
+                backlog.extend(payload)
+            else:
+                finished = True
+                error = payload
+    except queue.Empty:
+        pass
+    try:
+        # Egy ütemben csak korlátozott számú sor kerül beszúrásra, hogy a felület reagáljon
+        rows, backlog[:] = backlog[:FILE_LOAD_ROWS_PER_TICK], backlog[FILE_LOAD_ROWS_PER_TICK:]
+        for name, path, size, done_entry in rows:
+            item = tree.insert("", "end", values=build_row_values(len(loaded_items) + 1, name, size, path, done_entry))
+            loaded_items.append((item, path))
+    except Exception as e:
+        logger.error(f"Hiba a sorok beszúrásakor: {e}")
+    if finished and not backlog:
+        finish_file_load(scanner, error)
+        return
+    loading_status_label.config(text=f"Fájlok betöltése... {len(loaded_items)} fájl")
+    root.after(FILE_LOAD_POLL_MS, poll_file_load_events, scanner, backlog)
+
+# --- Sor értékei, a munkamenet napló szerinti állapottal ---
+def build_row_values(index, name, size, path, done_entry=None):
+    values = [index, name, f"{size / (1024 * 1024):.1f}", "-", "-", "-", "-", "-", "-", "-", "-", "-", "-", "Készenlét", "-",
+              path, "-"]
+    record = session_state.get(path)
+    if record is None:
+        if done_entry is not None:
+            # Egy korábbi futásban (esetleg más néven) már tömörítve
+            values[4] = "100.0%"
+            values[6] = os.path.basename(done_entry["output"])
+            values[7] = f"{done_entry['output_size'] / (1024 * 1024):.1f}"
+            if size:
+                values[9] = f"{100.0 * done_entry['output_size'] / size:.1f}%"
+            values[13] = STATUS_LABELS[STATUS_SKIPPED]
+        return values
+    if record["state"] == STATUS_DONE:
+        values[4] = "100.0%"
+        values[6] = os.path.basename(record["output"])
+        values[7] = f"{record['output_size'] / (1024 * 1024):.1f}"
+        if size:
+            values[9] = f"{100.0 * record['output_size'] / size:.1f}%"
+        if record.get("start"):
+            values[10] = time.strftime('%H:%M:%S', time.localtime(record["start"]))
+        if record.get("end"):
+            values[11] = time.strftime('%H:%M:%S', time.localtime(record["end"]))
+        if record.get("runtime") is not None:
+            values[12] = format_hms(record["runtime"])
+        values[13] = STATUS_LABELS[STATUS_DONE]
+    elif record["state"] == STATUS_FAILED:
+        values[13] = STATUS_LABELS[STATUS_FAILED]
+    return values
+
+def finish_file_load(scanner, error):
+    global file_scanner
+    file_scanner = None
+    if error:
+        loading_status_label.config(text=f"Hiba a fájlok betöltésekor: {error}")
+        messagebox.showerror("Hiba", f"Hiba a fájlok betöltésekor: {error}")
+        return
+    loading_status_label.config(text=f"Betöltve: {len(loaded_items)} fájl")
+    logger.info(f"Fájlok betöltve a Treeview-ba: {scanner.directory} ({len(loaded_items)} fájl)")
+    if timings is not None:
+        timings.record(scanner.directory, STAGE_SCAN, scanner.started, time.time())
+    build_timestamp_index()
+    start_metadata_scan(list(loaded_items))
+
+# --- Időbélyeg index a fájlnevekből (a "Fájl típus" választás szerint) ---
+def build_timestamp_index():
+    global timestamp_index
+    try:
+        timestamp_index = TimestampIndex(file_type_var.get()).build(
+            (item, os.path.basename(path)) for item, path in loaded_items)
+        logger.info(f"Időbélyeg index: {len(timestamp_index)} fájl, csatornák: {', '.join(timestamp_index.channels()) or '-'}"
+                    f", {timestamp_index.unmatched} nem illeszkedő fájlnév")
+    except Exception as e:
+        logger.error(f"Hiba az időbélyeg index készítésekor: {e}")
+        timestamp_index = None
+
+def log_level_changed(event=None):
+    set_log_level(log_level_var.get())
+    save_settings()
+
+def file_type_changed():
+    save_settings()
+    if loaded_items and not is_file_load_active():
+        build_timestamp_index()
+
+# --- Időszak és csatorna szerinti kijelölés; a feldolgozás csak a kijelölt sorokra fut ---
+def select_time_range():
+    global range_selection
+    try:
+        if timestamp_index is None:
+            messagebox.showinfo("Információ", "Előbb töltse be a fájlokat.")
+            return
+        start = parse_time(range_from_var.get()) if range_from_var.get().strip() else None
+        end = parse_time(range_to_var.get()) if range_to_var.get().strip() else None
+        channels = [channel.strip() for channel in channel_filter_var.get().split(",") if channel.strip()]
+        items = timestamp_index.select(start, end, channels or None)
+        tree.selection_set(items)
+        range_selection = set(items)
+        if items:
+            tree.see(items[0])
+        status_label.config(text=f"Kijelölve: {len(items)} fájl (a feldolgozás csak ezekre fut)")
+        logger.info(f"Időszak kijelölés: {range_from_var.get()} - {range_to_var.get()}, csatornák: {channels or 'mind'}: "
+                    f"{len(items)} fájl")
+    except ValueError as e:
+        messagebox.showerror("Hiba", str(e))
+    except Exception as e:
+        logger.error(f"Hiba az időszak kijelölésekor: {e}")
+
+# --- Hézagok és átfedések az egymást követő felvételek között ---
+def show_recording_gaps():
+    try:
+        if timestamp_index is None:
+            messagebox.showinfo("Információ", "Előbb töltse be a fájlokat.")
+            return
+        durations = {item: meta.get("duration") for item, meta in file_metadata.items() if meta}
+        findings = timestamp_index.find_gaps(durations)
+        lines = []
+        for channel, kind, previous, current, delta in findings:
+            line = (f"{channel or '-'}: {'hézag' if kind == 'gap' else 'átfedés'} {format_hms(delta)} "
+                    f"{format_time(timestamp_index.start_of(previous))} -> {format_time(timestamp_index.start_of(current))}")
+            lines.append(line)
+            logger.info(f"Felvétel {line}")
+        gaps = sum(1 for finding in findings if finding[1] == "gap")
+        summary = f"{gaps} hézag, {len(findings) - gaps} átfedés"
+        if len(lines) > 20:
+            lines = lines[:20] + ["... (a teljes lista a naplóban)"]
+        messagebox.showinfo("Hézagok / átfedések", summary + ("\n\n" + "\n".join(lines) if lines else ""))
+    except Exception as e:
+        logger.error(f"Hiba a hézagok keresésekor: {e}")
+
+# --- Előnézetek (bélyegkép sáv és rövid klip) alacsony prioritású háttér készletben ---
+def get_preview_generator():
+    global preview_generator
+    if preview_generator is None or preview_generator.ffmpeg_path != ffmpeg_path_var.get():
+        if preview_generator is not None:
+            preview_generator.close()
+        preview_generator = PreviewGenerator(ffmpeg_path_var.get(), PreviewCache(PREVIEW_CACHE_DIR),
+                                             on_done=lambda *result: preview_events.put(result))
+        preview_generator.throttle(scheduler is not None and scheduler.is_running())
+    return preview_generator
+
+def request_preview(item, urgent=False):
+    values = tree.set(item)
+    input_path = values.get("InputPath")
+    if not input_path or input_path == "-":
+        return False
+    try:
+        duration = float(values.get("DurationSec"))
+    except (TypeError, ValueError):
+        duration = None
+    get_preview_generator().request(item, input_path, duration=duration, urgent=urgent)
+    return True
+
+# A kijelölt sorokhoz (kijelölés nélkül az összeshez) készít előnézetet
+def generate_previews():
+    try:
+        items = tree.selection() or tree.get_children()
+        requested = sum(1 for item in items if request_preview(item))
+        status_label.config(text=f"Előnézetek: {requested} fájl sorban")
+        schedule_preview_poll()
+    except Exception as e:
+        logger.error(f"Hiba az előnézetek indításakor: {e}")
+
+# Dupla kattintás: kész előnézet megnyitása, egyébként sürgős előnézet kérése
+def open_row_preview(event):
+    item = tree.identify_row(event.y)
+    if not item:
+        return
+    try:
+        preview_open_requested.add(item)
+        if request_preview(item, urgent=True):
+            schedule_preview_poll()
+        else:
+            preview_open_requested.discard(item)
+    except Exception as e:
+        logger.error(f"Hiba az előnézet kérésekor: {e}")
+
+def schedule_preview_poll():
+    global preview_polling
+    if not preview_polling:
+        preview_polling = True
+        root.after(PREVIEW_POLL_MS, poll_preview_events)
+
+def poll_preview_events():
+    global preview_polling
+    preview_polling = False
+    try:
+        while True:
+            item, input_path, result, error = preview_events.get_nowait()
+            if item not in preview_open_requested:
+                continue
+            preview_open_requested.discard(item)
+            if error:
+                messagebox.showerror("Hiba", f"Az előnézet nem készült el: {os.path.basename(input_path)}\n{error}")
+            else:
+                show_preview_window(input_path, result)
+    except queue.Empty:
+        pass
+    except Exception as e:
+        logger.error(f"Hiba az előnézet eredmények feldolgozásakor: {e}")
+    remaining = preview_generator.pending() if preview_generator is not None else 0
+    if remaining or not preview_events.empty():
+        if not (scheduler is not None and scheduler.is_running()):
+            loading_status_label.config(text=f"Előnézetek készülnek: {remaining} hátra")
+        schedule_preview_poll()
+    elif not (scheduler is not None and scheduler.is_running()):
+        loading_status_label.config(text="Előnézetek elkészültek")
+
+def show_preview_window(input_path, result):
+    window = tk.Toplevel(root)
+    window.title(f"Előnézet - {os.path.basename(input_path)}")
+    image = tk.PhotoImage(file=result["strip"])
+    label = ttk.Label(window, image=image)
+    label.image = image
+    label.grid(row=0, column=0, columnspan=2, padx=5, pady=5)
+    ttk.Button(window, text="Klip lejátszása", command=lambda: open_with_system_player(result["clip"])).grid(
+        row=1, column=0, padx=5, pady=5, sticky="ew")
+    ttk.Button(window, text="Bezárás", command=window.destroy).grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+
+def open_with_system_player(path):
+    try:
+        if sys.platform.startswith("win"):
+            os.startfile(path)
+        else:
+            subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", path])
+    except Exception as e:
+        logger.error(f"Hiba a klip megnyitásakor: {path}: {e}")
+        messagebox.showerror("Hiba", f"A klip nem nyitható meg: {e}")
+
+def cancel_file_load():
+    global file_scanner
+    if file_scanner is not None:
+        file_scanner.cancel()
+        file_scanner = None
+    while True:
+        try:
+            file_load_events.get_nowait()
+        except queue.Empty:
+            break
+
+def is_file_load_active():
+    return file_scanner is not None
+
+# --- A kimeneti (vagy napló) mappában tárolt ujjlenyomat index ---
+def get_fingerprint_index():
+    global fingerprint_index
+    directory = log_output_dir_path_var.get() or output_dir_path_var.get()
+    if not directory:
+        return None
+    if fingerprint_index is None or fingerprint_index.directory != directory:
+        if fingerprint_index is not None:
+            fingerprint_index.save()
+        fingerprint_index = FingerprintIndex(directory)
+    fingerprint_index.profile_name = selected_profile_name_var.get()
+    return fingerprint_index
+
+# --- Treeview tömeges ürítése egyetlen Tcl hívással ---
+def clear_tree():
+    children = tree.get_children()
+    if children:
+        tree.delete(*children)
+    global timestamp_index, range_selection
+    loaded_items.clear()
+    file_metadata.clear()
+    timestamp_index = None
+    range_selection = None
+
+# --- Metaadatok (méret, időtartam) háttérben történő beolvasása ---
+def start_metadata_scan(items=None):
+    global metadata_cache, metadata_scanner, metadata_received
+    logger.debug("Metaadat olvasás indítása")
+    try:
+        cancel_metadata_scan()
+        if metadata_cache is None:
+            metadata_cache = MetadataCache(METADATA_CACHE_FILE)
+        if items is None:
+            items = []
+            for item in tree.get_children():
+                input_path = tree.set(item, "InputPath")
+                if input_path and input_path != "-":
+                    items.append((item, input_path))
+        if not items:
+            return
+        scanner = MetadataScanner(ffprobe_path_var.get(), metadata_cache,
+                                  on_result=lambda *result: metadata_events.put((scanner, result)))
+        metadata_received = 0
+        metadata_scanner = scanner
+        scanner.start(items)
+        loading_status_label.config(text=f"Metaadatok olvasása: 0/{len(items)}")
+        root.after(METADATA_POLL_MS, poll_metadata_events, scanner)
+    except Exception as e:
+        logger.error(f"Hiba a metaadat olvasás indításakor: {e}")
+
+def cancel_metadata_scan():
+    global metadata_scanner
+    if metadata_scanner is not None:
+        metadata_scanner.cancel()
+        metadata_scanner = None
+    while True:
+        try:
+            metadata_events.get_nowait()
+        except queue.Empty:
+            break
+
+def poll_metadata_events(scanner):
+    global metadata_received
+    if scanner is not metadata_scanner:
+        return
+    try:
+        for _ in range(METADATA_EVENTS_PER_TICK):
+            source, (item, input_path, meta, error) = metadata_events.get_nowait()
+            if source is not scanner:
+                continue
+            metadata_received += 1
+            if not tree.exists(item):
+                continue
+            if meta is None:
+                tree.set(item, "Időtartam", "Hiba")
+                continue
+            file_metadata[item] = meta
+            if meta.get("size_bytes") is not None:
+                tree.set(item, "Bemenet (MB)", f"{meta['size_bytes'] / (1024 * 1024):.1f}")
+            if meta.get("duration") is not None:
+                tree.set(item, "Időtartam", format_hms(meta["duration"]))
+                tree.set(item, "DurationSec", f"{meta['duration']:.3f}")
+    except queue.Empty:
+        pass
+    except Exception as e:
+        logger.error(f"Hiba a metaadat eredmények feldolgozásakor: {e}")
+    if metadata_received >= scanner.total or (not scanner.is_running() and metadata_events.empty()):
+        if timings is not None:
+            timings.record(input_dir_path_var.get(), STAGE_PROBE, scanner.started, time.time())
+        loading_status_label.config(text=f"Metaadatok beolvasva: {metadata_received}/{scanner.total} "
+                                         f"({scanner.cache_hits} gyorsítótárból)")
+        return
+    loading_status_label.config(text=f"Metaadatok olvasása: {metadata_received}/{scanner.total}")
+    root.after(METADATA_POLL_MS, poll_metadata_events, scanner)
+
 # --- Feldolgozás indítása ---
 def start_processing_thread():
+    global scheduler, job_journal, speed_history, eta_estimator, session_start_time, last_eta_refresh, report_writer
+    global timings, shared_queue
     logger.debug("Feldolgozás indítása")
     try:
-        # Placeholder: Feldolgozás logika
-        status_label.config(text="Feldolgozás folyamatban...")
+        if scheduler is not None and scheduler.is_running():
+            logger.warning("A feldolgozás már folyamatban van")
+            return
+        output_dir = output_dir_path_var.get()
+        if not output_dir:
+            messagebox.showerror("Hiba", "Nincs kimeneti mappa megadva!")
+            logger.error("Nincs kimeneti mappa megadva")
+            return
+        profile_name = selected_profile_name_var.get()
+        profile = PROFILES.get(profile_name, selected_profile)
+        if job_journal is None:
+            job_journal = JobJournal(JOURNAL_FILE)
+        if timings is None:
+            timings = SpanRecorder()
+        shared_queue = open_shared_queue()
+        if shared_queue is not None:
+            shared_queue.start()
+        scheduler = JobScheduler(ffmpeg_path_var.get(), profile, num_threads_var.get(),
+                                 on_event=lambda event, job: scheduler_events.put((event, job)),
+                                 auto_threads=auto_threads_var.get(), pin_cpus=pin_cpus_var.get(),
+                                 journal=job_journal, index=get_fingerprint_index(),
+                                 ffprobe_path=ffprobe_path_var.get(),
+                                 segment_threshold_sec=segment_threshold_var.get() * 60 if segment_mode_var.get() else None,
+                                 autotuner=AutoTuner(ffmpeg_path_var.get(), AutoProfileCache(AUTO_PROFILE_CACHE_FILE))
+                                 if profile.get("auto") else None,
+                                 passthrough_mode=passthrough_mode_var.get(),
+                                 scratch_dir=scratch_dir_path_var.get(),
+                                 order=ORDER_CHRONOLOGICAL if chronological_order_var.get() else ORDER_SIZE,
+                                 timings=timings, shared_queue=shared_queue)
+        taken = set()
+        for item in tree.get_children():
+            if range_selection is not None and item not in range_selection:
+                continue
+            values = tree.set(item)
+            if values.get("Státusz") == STATUS_LABELS[STATUS_DONE]:
+                continue
+            input_path = values.get("InputPath")
+            if not input_path or input_path == "-":
+                continue
+            duration = values.get("DurationSec")
+            job = make_job(item, input_path, output_dir,
+                           duration_sec=float(duration) if duration not in (None, "", "-") else None,
+                           metadata=file_metadata.get(item), taken=taken)
+            if job is None:
+                continue
+            if timestamp_index is not None:
+                job.recorded_at = timestamp_index.start_of(item)
+            scheduler.add_job(job)
+            tree.set(item, "Státusz", STATUS_LABELS[STATUS_QUEUED])
+        if not scheduler.jobs:
+            messagebox.showinfo("Információ", "Nincs feldolgozandó fájl.")
+            logger.info("Nincs feldolgozandó fájl")
+            scheduler = None
+            return
+        if speed_history is None:
+            speed_history = SpeedHistory(SPEED_HISTORY_FILE)
+        eta_estimator = EtaEstimator(speed_history, profile_name)
+        last_eta_refresh = 0.0
+        formats = enabled_formats({"excel_log": excel_log_var.get(), "pdf_log": pdf_log_var.get(),
+                                   "txt_log": txt_log_var.get(), "json_log": json_log_var.get()})
+        report_writer = ReportWriter(log_output_dir_path_var.get() or output_dir, formats,
+                                     status_labels=STATUS_LABELS) if formats else None
+        scheduler.start()
+        if preview_generator is not None:
+            preview_generator.throttle(True)
+        session_start_time = time.time()
+        status_label.config(text=f"Feldolgozás folyamatban... ({len(scheduler.jobs)} fájl, {scheduler.num_workers} szál)")
         logger.info("Feldolgozás sikeresen elindítva")
         set_ui_processing_state(True)
+        root.after(SCHEDULER_POLL_MS, poll_scheduler_events)
     except Exception as e:
         logger.error(f"Hiba a feldolgozás indításakor: {e}")
         messagebox.showerror("Hiba", f"Hiba a feldolgozás indításakor: {e}")
 
+# --- Ütemező eseményeinek feldolgozása a Tk szálon ---
+def poll_scheduler_events():
+    global last_progress_refresh
+    batch_finished = False
+    try:
+        while True:
+            event, job = scheduler_events.get_nowait()
+            if event == EVENT_BATCH_FINISHED:
+                batch_finished = True
+            elif event in (EVENT_JOB_STARTED, EVENT_JOB_FINISHED):
+                update_job_row(job)
+                if event == EVENT_JOB_FINISHED and job.status == STATUS_DONE:
+                    eta_estimator.record_job(job)
+                if event == EVENT_JOB_FINISHED and report_writer is not None:
+                    with timings.span(job.input_path, STAGE_REPORT):
+                        report_writer.write_job(job)
+    except queue.Empty:
+        pass
+    except Exception as e:
+        logger.error(f"Hiba az ütemező események feldolgozásakor: {e}")
+    # A haladás kijelzése ritkítva frissül, függetlenül a párhuzamos kódolások számától
+    now = time.time()
+    if batch_finished or now - last_progress_refresh >= PROGRESS_REFRESH_SEC:
+        last_progress_refresh = now
+        refresh_progress_display()
+    if batch_finished:
+        done = sum(1 for job in scheduler.jobs if job.status == STATUS_DONE)
+        skipped = sum(1 for job in scheduler.jobs if job.status == STATUS_SKIPPED)
+        # A sorban maradt és megszakított fájlok újra indíthatók
+        for job in scheduler.jobs:
+            if job.status in (STATUS_QUEUED, STATUS_CANCELLED) and tree.exists(job.job_id):
+                tree.set(job.job_id, "Státusz", "Készenlét")
+                tree.set(job.job_id, "Kész%", "-")
+        if scheduler.is_cancelled():
+            outcome = "megszakítva"
+        elif scheduler.is_stopped():
+            outcome = "leállítva"
+        else:
+            outcome = "befejezve"
+        status_label.config(text=f"Feldolgozás {outcome}: {done}/{len(scheduler.jobs)} sikeres, {skipped} kihagyva.")
+        processing_completed_label.config(text=f"Lezárt időpont: {time.strftime('%H:%M:%S')}")
+        remaining_time_label.config(text="Hátralévő idő: 00:00:00")
+        speed_history.save()
+        close_report(done, skipped, outcome)
+        export_timings()
+        close_shared_queue()
+        if preview_generator is not None:
+            preview_generator.throttle(False)
+        set_ui_processing_state(False)
+        logger.info("Feldolgozás befejezve")
+    else:
+        root.after(SCHEDULER_POLL_MS, poll_scheduler_events)
+
+def close_report(done, skipped, outcome):
+    global report_writer
+    if report_writer is None:
+        return
+    try:
+        failed = sum(1 for job in scheduler.jobs if job.status == STATUS_FAILED)
+        report_writer.close({"Fájlok": len(scheduler.jobs), "Sikeres": done, "Kihagyva": skipped, "Hiba": failed,
+                             "Eredmény": outcome, "Futásidő": format_hms(time.time() - session_start_time)})
+    except Exception as e:
+        logger.error(f"Hiba a jelentés lezárásakor: {e}")
+    report_writer = None
+
+def close_shared_queue():
+    global shared_queue
+    if shared_queue is None:
+        return
+    try:
+        shared_queue.close()
+    except Exception as e:
+        logger.error(f"Hiba a közös feladatsor lezárásakor: {e}")
+    shared_queue = None
+
+# --- Szakaszonkénti időmérés mentése a napló mappába ---
+def export_timings():
+    global timings
+    if timings is None:
+        return
+    try:
+        log_dir = log_output_dir_path_var.get() or output_dir_path_var.get()
+        timings.export_json(os.path.join(log_dir, time.strftime("idomeres_%Y%m%d_%H%M%S.json")))
+        for stage, entry in timings.summary().items():
+            logger.info(f"Időmérés: {stage}: {entry['count']} db, összesen {entry['total_sec']} s, "
+                        f"leghosszabb {entry['max_sec']} s")
+    except Exception as e:
+        logger.error(f"Hiba az időmérés mentésekor: {e}")
+    timings = None
+
+def refresh_progress_display():
+    try:
+        for job in scheduler.running_jobs():
+            if not tree.exists(job.job_id):
+                continue
+            if job.duration_sec:
+                tree.set(job.job_id, "Kész%", f"{100.0 * job.fraction():.1f}%")
+            tree.set(job.job_id, "Idő", format_hms(job.encoded_sec))
+            if job.speed is not None:
+                tree.set(job.job_id, "Futás", f"{job.speed:.2f}x")
+        percent = 100.0 * scheduler.overall_fraction()
+        progress_var.set(percent)
+        progress_percent_label.config(text=f"{percent:.1f} %")
+    except Exception as e:
+        logger.error(f"Hiba a haladás kijelzésekor: {e}")
+
+def update_job_row(job):
+    if not tree.exists(job.job_id):
+        return
+    tree.set(job.job_id, "Státusz", STATUS_LABELS.get(job.status, job.status))
+    tree.set(job.job_id, "Típus", ACTION_LABELS.get(job.action, job.action))
+    if job.start_time:
+        tree.set(job.job_id, "Kezdő Idő", time.strftime('%H:%M:%S', time.localtime(job.start_time)))
+    if job.end_time:
+        tree.set(job.job_id, "Végző Idő", time.strftime('%H:%M:%S', time.localtime(job.end_time)))
+        tree.set(job.job_id, "Futásidő", format_hms(job.runtime()))
+    if job.status in (STATUS_DONE, STATUS_SKIPPED) and job.output_size is not None:
+        tree.set(job.job_id, "Kész%", "100.0%")
+        if job.duration_sec:
+            tree.set(job.job_id, "Idő", format_hms(job.duration_sec))
+        tree.set(job.job_id, "Kimenet", os.path.basename(job.output_path))
+        tree.set(job.job_id, "Méret", f"{job.output_size / (1024 * 1024):.1f}")
+        if job.size_bytes:
+            tree.set(job.job_id, "Tömörítés", f"{100.0 * job.output_size / job.size_bytes:.1f}%")
+
 # --- Feldolgozás szüneteltetése/folytatása ---
 def pause_resume_processing():
     logger.debug("Feldolgozás szüneteltetése/folytatása")
     try:
-        # Placeholder: Szünet/folytatás logika
-        logger.info("Feldolgozás szüneteltetve/folytatva")
+        if scheduler is None or not scheduler.is_running():
+            return
+        if scheduler.is_paused():
+            scheduler.resume()
+            pause_resume_button.config(text="Szünet/Folytatás")
+            status_label.config(text="Feldolgozás folyamatban...")
+            logger.info("Feldolgozás folytatva")
+        else:
+            scheduler.pause()
+            pause_resume_button.config(text="Folytatás")
+            status_label.config(text="Feldolgozás szüneteltetve.")
+            logger.info("Feldolgozás szüneteltetve")
     except Exception as e:
         logger.error(f"Hiba a szüneteltetés/folytatás során: {e}")
 
@@ -257,10 +948,13 @@ def pause_resume_processing():
 def stop_processing():
     logger.debug("Feldolgozás leállítása")
     try:
-        # Placeholder: Leállítás logika
-        status_label.config(text="Feldolgozás leállítva.")
-        logger.info("Feldolgozás sikeresen leállítva")
-        set_ui_processing_state(False)
+        if scheduler is None or not scheduler.is_running():
+            return
+        # A futó feladatok befejeződnek; a felület a köteg végén áll vissza
+        scheduler.stop()
+        pause_resume_button.config(text="Szünet/Folytatás")
+        status_label.config(text="Leállítás: a futó feladatok befejezése...")
+        logger.info("Feldolgozás leállítása kérve")
     except Exception as e:
         logger.error(f"Hiba a feldolgozás leállításakor: {e}")
 
@@ -268,10 +962,17 @@ def stop_processing():
 def cancel_processing():
     logger.debug("Feldolgozás megszakítása")
     try:
-        # Placeholder: Megszakítás logika
-        status_label.config(text="Feldolgozás megszakítva.")
-        logger.info("Feldolgozás sikeresen megszakítva")
-        set_ui_processing_state(False)
+        if is_file_load_active():
+            cancel_file_load()
+            loading_status_label.config(text=f"Betöltés megszakítva: {len(loaded_items)} fájl")
+            logger.info("Fájlok betöltése megszakítva")
+            return
+        if scheduler is None or not scheduler.is_running():
+            return
+        scheduler.cancel()
+        pause_resume_button.config(text="Szünet/Folytatás")
+        status_label.config(text="Megszakítás: a futó feladatok leállítása...")
+        logger.info("Feldolgozás megszakítása kérve")
     except Exception as e:
         logger.error(f"Hiba a feldolgozás megszakításakor: {e}")
 
@@ -279,8 +980,10 @@ def cancel_processing():
 def clear_all_data():
     logger.debug("Adatok törlése")
     try:
-        for item in tree.get_children():
-            tree.delete(item)
+        cancel_file_load()
+        cancel_metadata_scan()
+        clear_tree()
+        loading_status_label.config(text="")
         status_label.config(text="Adatok törölve.")
         logger.info("Adatok sikeresen törölve")
     except Exception as e:
@@ -300,7 +1003,31 @@ def open_verzio_log():
 def exit_program():
     logger.debug("Program kilépése")
     try:
+        if scheduler is not None and scheduler.is_running():
+            if not messagebox.askyesno("Kilépés", "A feldolgozás folyamatban van. Megszakítja és kilép?"):
+                return
+            # A futó (akár szüneteltetett) FFmpeg folyamatok leállítása és a félkész kimenetek törlése,
+            # mielőtt a napló lezárul
+            scheduler.cancel()
+            if not scheduler.wait(EXIT_CANCEL_WAIT_SEC):
+                logger.warning("A megszakított feldolgozás nem állt le időben")
+            done = sum(1 for job in scheduler.jobs if job.status == STATUS_DONE)
+            skipped = sum(1 for job in scheduler.jobs if job.status == STATUS_SKIPPED)
+            close_report(done, skipped, "megszakítva")
+            close_shared_queue()
         save_settings()
+        cancel_file_load()
+        cancel_metadata_scan()
+        if metadata_cache is not None:
+            metadata_cache.save()
+        if speed_history is not None:
+            speed_history.save()
+        if job_journal is not None:
+            job_journal.close()
+        if fingerprint_index is not None:
+            fingerprint_index.save()
+        if preview_generator is not None:
+            preview_generator.close()
         root.destroy()
         logger.info("Program sikeresen bezárva")
     except Exception as e:
@@ -308,7 +1035,7 @@ def exit_program():
 
 # --- GUI állapot beállítása ---
 def set_ui_processing_state(is_processing_active):
-    logger.debug(f"set_ui_processing_state hívása - is_processing_active: {is_processing_active}")
+    logger.debug("set_ui_processing_state hívása - is_processing_active: %s", is_processing_active)
     try:
         if browse_input_folder_button:
             browse_input_folder_button.config(state=tk.DISABLED if is_processing_active else tk.NORMAL)
@@ -334,17 +1061,33 @@ def set_ui_processing_state(is_processing_active):
 
 # --- Időkijelzők frissítése ---
 def update_time_displays():
-    logger.debug("Időkijelzők frissítése")
     try:
         if program_start_time:
             elapsed = time.time() - program_start_time
-            hours, rem = divmod(elapsed, 3600)
-            minutes, seconds = divmod(rem, 60)
-            program_elapsed_time_label.config(text=f"Program futási ideje: {int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}")
+            program_elapsed_time_label.config(text=f"Program futási ideje: {format_hms(elapsed)}")
+        if scheduler is not None and scheduler.is_running():
+            session_elapsed_time_label.config(text=f"Munkamenet futási ideje:  {format_hms(time.time() - session_start_time)}")
+            update_eta_displays()
         root.after(1000, update_time_displays)
     except Exception as e:
         logger.error(f"Hiba az időkijelzők frissítésekor: {e}")
 
+# --- Hátralévő idő és vélt záró időpont ---
+def update_eta_displays():
+    global last_eta_refresh
+    now = time.time()
+    if now - last_eta_refresh < ETA_REFRESH_SEC:
+        return
+    last_eta_refresh = now
+    remaining = eta_estimator.remaining_seconds(scheduler)
+    if remaining is None:
+        remaining_time_label.config(text="Hátralévő idő: --:--:--")
+        estimated_completion_label.config(text="Vélt záró időpont: --:--:--")
+        return
+    remaining_time_label.config(text=f"Hátralévő idő: {format_hms(remaining)}")
+    estimated_completion_label.config(
+        text=f"Vélt záró időpont: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now + remaining))}")
+
 # --- GUI Inicializálás ---
 def initialize_gui():
     global browse_input_folder_button, browse_output_folder_button, select_log_output_dir_button
@@ -395,20 +1138,67 @@ def initialize_gui():
     profile_menu.grid(row=4, column=1, padx=5, pady=2, sticky="ew")
 
     ttk.Label(top_frame, text="Fájl típus:").grid(row=5, column=0, padx=5, pady=2, sticky="w")
-    ttk.Radiobutton(top_frame, text="ch_YYYYMMDDHHMMSS", variable=file_type_var, value="ch", command=save_settings).grid(
+    ttk.Radiobutton(top_frame, text="ch_YYYYMMDDHHMMSS", variable=file_type_var, value="ch", command=file_type_changed).grid(
         row=5, column=1, padx=5, pady=2, sticky="w")
-    ttk.Radiobutton(top_frame, text="Egyéb (YYYY_MYD_HMS)", variable=file_type_var, value="other", command=save_settings).grid(
+    ttk.Radiobutton(top_frame, text="Egyéb (YYYY_MYD_HMS)", variable=file_type_var, value="other", command=file_type_changed).grid(
         row=5, column=1, padx=5, pady=2, sticky="e")
 
     ttk.Label(top_frame, text="Szálak száma:").grid(row=6, column=0, padx=5, pady=2, sticky="w")
     ttk.Spinbox(top_frame, from_=1, to=os.cpu_count() or 1, textvariable=num_threads_var, width=5, command=save_settings).grid(
         row=6, column=1, padx=5, pady=2, sticky="w")
+    ttk.Checkbutton(top_frame, text="Automatikus", variable=auto_threads_var, command=save_settings).grid(
+        row=6, column=1, padx=70, pady=2, sticky="w")
+    ttk.Checkbutton(top_frame, text="CPU rögzítés", variable=pin_cpus_var, command=save_settings).grid(
+        row=6, column=1, padx=5, pady=2, sticky="e")
 
     ttk.Label(top_frame, text="Napló formátumok:").grid(row=7, column=0, padx=5, pady=2, sticky="w")
     ttk.Checkbutton(top_frame, text="Excel", variable=excel_log_var, command=save_settings).grid(row=7, column=1, padx=5, pady=2, sticky="w")
     ttk.Checkbutton(top_frame, text="PDF", variable=pdf_log_var, command=save_settings).grid(row=7, column=1, padx=50, pady=2)
     ttk.Checkbutton(top_frame, text="TXT", variable=txt_log_var, command=save_settings).grid(row=7, column=1, padx=100, pady=2)
     ttk.Checkbutton(top_frame, text="JSON", variable=json_log_var, command=save_settings).grid(row=7, column=1, padx=150, pady=2, sticky="w")
+    log_level_menu = ttk.Combobox(top_frame, textvariable=log_level_var, values=LOG_LEVELS, width=8, state="readonly")
+    log_level_menu.grid(row=7, column=2, padx=5, pady=2)
+    log_level_menu.bind("<<ComboboxSelected>>", log_level_changed)
+
+    ttk.Label(top_frame, text="Szakaszos kódolás:").grid(row=8, column=0, padx=5, pady=2, sticky="w")
+    ttk.Checkbutton(top_frame, text="Bekapcsolva", variable=segment_mode_var, command=save_settings).grid(
+        row=8, column=1, padx=5, pady=2, sticky="w")
+    ttk.Spinbox(top_frame, from_=10, to=1440, textvariable=segment_threshold_var, width=5, command=save_settings).grid(
+        row=8, column=1, padx=100, pady=2, sticky="w")
+    ttk.Label(top_frame, text="perc felett").grid(row=8, column=1, padx=160, pady=2, sticky="w")
+
+    ttk.Label(top_frame, text="Felesleges újrakódolás:").grid(row=9, column=0, padx=5, pady=2, sticky="w")
+    ttk.Radiobutton(top_frame, text="Kódolás", variable=passthrough_mode_var, value="off", command=save_settings).grid(
+        row=9, column=1, padx=5, pady=2, sticky="w")
+    ttk.Radiobutton(top_frame, text="Átcsomagolás", variable=passthrough_mode_var, value="remux", command=save_settings).grid(
+        row=9, column=1, padx=80, pady=2, sticky="w")
+    ttk.Radiobutton(top_frame, text="Kihagyás", variable=passthrough_mode_var, value="skip", command=save_settings).grid(
+        row=9, column=1, padx=190, pady=2, sticky="w")
+
+    ttk.Label(top_frame, text="Átmeneti mappa:").grid(row=10, column=0, padx=5, pady=2, sticky="w")
+    scratch_dir_entry = ttk.Entry(top_frame, textvariable=scratch_dir_path_var, width=50)
+    scratch_dir_entry.grid(row=10, column=1, padx=5, pady=2)
+    select_scratch_dir_button = ttk.Button(top_frame, text="Tallóz", command=select_scratch_dir)
+    select_scratch_dir_button.grid(row=10, column=2, padx=5, pady=2)
+
+    ttk.Label(top_frame, text="Időszak (ÉÉÉÉ-HH-NN ÓÓ:PP):").grid(row=11, column=0, padx=5, pady=2, sticky="w")
+    ttk.Entry(top_frame, textvariable=range_from_var, width=18).grid(row=11, column=1, padx=5, pady=2, sticky="w")
+    ttk.Label(top_frame, text="-").grid(row=11, column=1, padx=140, pady=2, sticky="w")
+    ttk.Entry(top_frame, textvariable=range_to_var, width=18).grid(row=11, column=1, padx=155, pady=2, sticky="w")
+    ttk.Button(top_frame, text="Kijelölés", command=select_time_range).grid(row=11, column=2, padx=5, pady=2)
+
+    ttk.Label(top_frame, text="Csatorna (pl. ch01,ch02):").grid(row=12, column=0, padx=5, pady=2, sticky="w")
+    ttk.Entry(top_frame, textvariable=channel_filter_var, width=18).grid(row=12, column=1, padx=5, pady=2, sticky="w")
+    ttk.Checkbutton(top_frame, text="Időrendi sorrend", variable=chronological_order_var, command=save_settings).grid(
+        row=12, column=1, padx=155, pady=2, sticky="w")
+    ttk.Button(top_frame, text="Hézagok", command=show_recording_gaps).grid(row=12, column=2, padx=5, pady=2)
+
+    ttk.Label(top_frame, text="Közös feladatsor mappa:").grid(row=13, column=0, padx=5, pady=2, sticky="w")
+    ttk.Entry(top_frame, textvariable=shared_queue_dir_path_var, width=50).grid(row=13, column=1, padx=5, pady=2)
+    ttk.Button(top_frame, text="Tallóz", command=select_shared_queue_dir).grid(row=13, column=2, padx=5, pady=2)
+    ttk.Button(top_frame, text="Állapot", command=show_shared_queue_status).grid(row=14, column=1, padx=5, pady=2, sticky="w")
+    ttk.Button(top_frame, text="Összesített jelentés", command=write_shared_report).grid(
+        row=14, column=1, padx=80, pady=2, sticky="w")
 
     # Középső frame: Treeview
     middle_frame = ttk.Frame(root)
@@ -433,6 +1223,7 @@ def initialize_gui():
         "Index", "Fájlnév", "Bemenet (MB)", "Időtartam", "Kész%", "Futás", "Kimenet", "Méret", "Idő", "Tömörítés",
         "Kezdő Idő", "Végző Idő", "Futásidő", "Státusz", "Típus"
     )
+    tree.bind("<Double-1>", open_row_preview)
     tree_scrollbar_y = ttk.Scrollbar(middle_frame, orient="vertical", command=tree.yview)
     tree_scrollbar_x = ttk.Scrollbar(middle_frame, orient="horizontal", command=tree.xview)
     tree.configure(yscrollcommand=tree_scrollbar_y.set, xscrollcommand=tree_scrollbar_x.set)
@@ -468,6 +1259,8 @@ def initialize_gui():
     exit_program_button.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
     cancel_button = ttk.Button(button_frame, text="Mégse", command=cancel_processing)
     cancel_button.grid(row=2, column=2, padx=5, pady=5, sticky="ew")
+    preview_button = ttk.Button(button_frame, text="Előnézetek", command=generate_previews)
+    preview_button.grid(row=3, column=0, padx=5, pady=5, sticky="ew")
 
     status_label = ttk.Label(bottom_frame, text="Készenlétben.", anchor="w")
     status_label.grid(row=1, column=0, columnspan=3, padx=5, pady=2, sticky="ew")
@@ -496,7 +1289,6 @@ def initialize_gui():
 if __name__ == "__main__":
     logger.info(f"Program indítása: {SCRIPT_NAME}")
     program_start_time = time.time()
-    program_start_time_label.config(text=f"Program kezdési időpontja: {time.strftime('%H:%M:%S', time.localtime(program_start_time))}")
 
     # Beállítások és munkamenet állapot betöltése
     load_app_settings()
@@ -504,6 +1296,10 @@ if __name__ == "__main__":
 
     # GUI inicializálása
     initialize_gui()
+    program_start_time_label.config(text=f"Program kezdési időpontja: {time.strftime('%H:%M:%S', time.localtime(program_start_time))}")
+    if session_loaded_and_continued:
+        done = sum(1 for record in session_state.values() if record["state"] == STATUS_DONE)
+        status_label.config(text=f"Előző munkamenet visszaállítva: {done}/{len(session_state)} fájl kész.")
 
     # Tkinter események
     root.update_idletasks()
@@ -519,5 +1315,8 @@ if __name__ == "__main__":
         logger.debug("Bemeneti mappa betöltve, fájlok betöltése a Treeview-ba")
         load_files_to_treeview()
 
+    # Az ablak bezárása ugyanúgy megszakítja a futó feldolgozást, mint a Kilépés gomb
+    root.protocol("WM_DELETE_WINDOW", exit_program)
+
     # Fő ciklus
     root.mainloop()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_compressor.cpu_budget import available_cpus  # noqa: E402
+from video_compressor.profiles import PROFILES  # noqa: E402
+
+# Teljes feldolgozási lánc mérése (bejárás, FFprobe, ütemezés, kódolás) szintetikus klipeken.
+# Minden profil és párhuzamosság egy külön parancssori futás (python -m video_compressor), így a mért
+# falióra-idő, CPU-idő és csúcs memória (RSS) a teljes folyamatfára vonatkozik.
+#
+#   python benchmarks/benchmark_pipeline.py run --output baseline.json
+#   python benchmarks/benchmark_pipeline.py run --workers 1,4 --profiles Alacsony --output current.json
+#   python benchmarks/benchmark_pipeline.py compare baseline.json current.json --threshold 0.1
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRAME_RATE = 25
+DEFAULT_SOURCES = ("testsrc", "mandelbrot")
+DEFAULT_DURATIONS = (10, 30)
+DEFAULT_RESOLUTIONS = ("640x360", "1280x720")
+DEFAULT_THRESHOLD = 0.10
+# Mérőszám -> melyik irány a rosszabb (1: a növekedés, -1: a csökkenés)
+METRICS = {
+    "wall_sec": 1,
+    "cpu_sec": 1,
+    "peak_rss_mb": 1,
+    "fps": -1,
+    "ratio": 1
+}
+
+
+def generate_clip(ffmpeg_path, path, source, duration, resolution):
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"{source}=size={resolution}:rate={FRAME_RATE}",
+        "-t", str(duration), "-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-pix_fmt", "yuv420p", path
+    ]
+    subprocess.run(cmd, check=True)
+
+
+# A klipek a munkamappában maradnak, így ismételt futásnál nem készülnek újra
+def prepare_inputs(ffmpeg_path, directory, sources, durations, resolutions):
+    os.makedirs(directory, exist_ok=True)
+    frames = 0
+    for source in sources:
+        for duration in durations:
+            for resolution in resolutions:
+                path = os.path.join(directory, f"{source}_{resolution}_{duration}s.mp4")
+                if not os.path.exists(path):
+                    print(f"Tesztklip generálása: {os.path.basename(path)}")
+                    generate_clip(ffmpeg_path, path, source, duration, resolution)
+                frames += duration * FRAME_RATE
+    return frames
+
+
+def ffmpeg_version(ffmpeg_path):
+    try:
+        result = subprocess.run([ffmpeg_path, "-version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return result.stdout.decode("utf-8", errors="replace").splitlines()[0]
+    except (OSError, IndexError):
+        return None
+
+
+# Egy futás: friss kimeneti és munkamappa (nincs gyorsítótár, napló vagy index az előző futásból)
+def run_case(args, input_dir, profile_name, workers, frames):
+    with tempfile.TemporaryDirectory(prefix="vc_pipeline_") as work_dir:
+        output_dir = os.path.join(work_dir, "out")
+        cmd = [
+            sys.executable, "-m", "video_compressor", "-i", input_dir, "-o", output_dir, "-p", profile_name,
+            "-j", str(workers), "--passthrough", "off", "--log-formats", "none", "--no-resume",
+            "--settings", os.path.join(work_dir, "settings.json"), "--ffmpeg", args.ffmpeg, "--ffprobe", args.ffprobe,
+            "--progress-interval", "60", "--log-level", "WARNING"
+        ]
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PACKAGE_ROOT, os.environ.get("PYTHONPATH")])))
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=work_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        output = process.stdout.read()
+        # wait4: a gyermek és (lezárt) leszármazottai, azaz a kódoló FFmpeg folyamatok erőforrás-használata
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        process.stdout.close()
+
+    input_bytes = output_bytes = failed = 0
+    for line in output.decode("utf-8", errors="replace").splitlines():
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if event.get("event") != "job_finished":
+            continue
+        if event.get("status") != "done":
+            failed += 1
+            continue
+        input_bytes += event.get("size") or 0
+        output_bytes += event.get("output_size") or 0
+    cpu = usage.ru_utime + usage.ru_stime
+    return {
+        "case": f"{profile_name}|{workers}",
+        "profile": profile_name,
+        "workers": workers,
+        "exit_code": process.returncode,
+        "failed": failed,
+        "wall_sec": round(wall, 3),
+        "cpu_sec": round(cpu, 3),
+        "cpu_util": round(cpu / (wall * len(available_cpus())), 3) if wall else None,
+        # Linuxon a ru_maxrss kilobájtban van
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "fps": round(frames / wall, 2) if wall else None,
+        "ratio": round(output_bytes / input_bytes, 4) if input_bytes else None
+    }
+
+
+def median_run(runs):
+    return sorted(runs, key=lambda run: run["wall_sec"])[len(runs) // 2]
+
+
+def command_run(args):
+    profiles = args.profiles.split(",") if args.profiles else list(PROFILES)
+    unknown = [name for name in profiles if name not in PROFILES]
+    if unknown:
+        print(f"Ismeretlen profil: {', '.join(unknown)}")
+        return 2
+    cpu_count = len(available_cpus())
+    workers = [int(n) for n in args.workers.split(",")] if args.workers else sorted({1, max(1, cpu_count // 2), cpu_count})
+    sources = args.sources.split(",")
+    durations = [int(n) for n in args.durations.split(",")]
+    resolutions = args.resolutions.split(",")
+
+    work_dir = args.work_dir or os.path.join(tempfile.gettempdir(), "vc_pipeline_inputs")
+    input_dir = os.path.join(work_dir, "inputs")
+    frames = prepare_inputs(args.ffmpeg, input_dir, sources, durations, resolutions)
+
+    results = []
+    print(f"{'Eset':<20}{'Idő (s)':>10}{'CPU (s)':>10}{'CPU%':>8}{'RSS (MB)':>10}{'FPS':>10}{'Arány':>8}")
+    for profile_name in profiles:
+        for count in workers:
+            runs = [run_case(args, input_dir, profile_name, count, frames) for _ in range(args.repeat)]
+            result = median_run(runs)
+            results.append(result)
+            marker = "" if result["exit_code"] == 0 and not result["failed"] else f"  HIBA ({result['failed']} fájl)"
+            print(f"{result['case']:<20}{result['wall_sec']:>10.2f}{result['cpu_sec']:>10.2f}"
+                  f"{100 * (result['cpu_util'] or 0):>7.0f}%{result['peak_rss_mb']:>10.1f}"
+                  f"{result['fps'] or 0:>10.1f}{result['ratio'] or 0:>8.3f}{marker}")
+
+    data = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": cpu_count,
+            "ffmpeg": ffmpeg_version(args.ffmpeg)
+        },
+        "inputs": {
+            "sources": sources,
+            "durations": durations,
+            "resolutions": resolutions,
+            "frames": frames
+        },
+        "repeat": args.repeat,
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        print(f"Eredmények mentve: {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            return report_regressions(json.load(f), data, args.threshold)
+    return 0
+
+
+# Esetenként és mérőszámonként a relatív eltérés; a küszöbnél rosszabb eltérés visszalépésnek számít
+def find_regressions(baseline, current, threshold):
+    previous = {result["case"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        base = previous.get(result["case"])
+        if base is None:
+            continue
+        for metric, direction in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            rows.append((result["case"], metric, old, new, change, change * direction > threshold))
+    return rows
+
+
+def report_regressions(baseline, current, threshold):
+    if baseline.get("inputs") != current.get("inputs"):
+        print("Figyelem: a két mérés bemenetei eltérnek, az összevetés félrevezető lehet")
+    if baseline.get("host", {}).get("cpu_count") != current.get("host", {}).get("cpu_count"):
+        print("Figyelem: a két mérés eltérő számú CPU-n készült")
+    rows = find_regressions(baseline, current, threshold)
+    print(f"{'Eset':<20}{'Mérőszám':<14}{'Alap':>10}{'Most':>10}{'Eltérés':>10}")
+    for case, metric, old, new, change, regressed in rows:
+        print(f"{case:<20}{metric:<14}{old:>10.3f}{new:>10.3f}{100 * change:>+9.1f}%{'  VISSZALÉPÉS' if regressed else ''}")
+    regressions = sum(1 for row in rows if row[5])
+    print(f"{regressions} visszalépés (küszöb: {100 * threshold:.0f}%)")
+    return 1 if regressions else 0
+
+
+def command_compare(args):
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    return report_regressions(baseline, current, args.threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teljes feldolgozási lánc benchmark és visszalépés-ellenőrzés")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="mérés futtatása")
+    run_parser.add_argument("--ffmpeg", default="ffmpeg")
+    run_parser.add_argument("--ffprobe", default="ffprobe")
+    run_parser.add_argument("--profiles", help="vesszővel elválasztott profilnevek (alapértelmezés: mind)")
+    run_parser.add_argument("--workers", help="párhuzamos kódolások, pl. 1,2,4 (alapértelmezés: 1, fél és teljes CPU)")
+    run_parser.add_argument("--sources", default=",".join(DEFAULT_SOURCES), help="lavfi források")
+    run_parser.add_argument("--durations", default=",".join(map(str, DEFAULT_DURATIONS)), help="klip hosszak (s)")
+    run_parser.add_argument("--resolutions", default=",".join(DEFAULT_RESOLUTIONS))
+    run_parser.add_argument("--repeat", type=int, default=1, help="ismétlések esetenként (a medián számít)")
+    run_parser.add_argument("--work-dir", help="a generált klipek mappája (újrafelhasználva)")
+    run_parser.add_argument("--output", help="eredmények mentése JSON alapvonalként")
+    run_parser.add_argument("--compare", metavar="ALAPVONAL", help="összevetés egy korábbi méréssel")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run_parser.set_defaults(func=command_run)
+
+    compare_parser = subparsers.add_parser("compare", help="két mérés összevetése")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="relatív eltérés, amely felett visszalépést jelez (alapértelmezés: %(default)s)")
+    compare_parser.set_defaults(func=command_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_compressor.cpu_budget import affinity_prefix, available_cpus, pin_process, plan_thread_budget  # noqa: E402
+from video_compressor.profiles import PROFILES, build_encode_command  # noqa: E402
+
+# Szálkiosztás mérése: ugyanazt a szintetikus klipet kódolja párhuzamosan
+# különböző "feladat x szál" felosztásokkal, és képkocka/másodpercet jelent.
+#
+#   python benchmarks/benchmark_threads.py --profile Közepes --duration 20
+#   python benchmarks/benchmark_threads.py --splits 1x8,2x4,4x2,8x1 --pin
+
+FRAME_RATE = 25
+
+
+def generate_clip(ffmpeg_path, path, duration, resolution):
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={resolution}:rate={FRAME_RATE}:duration={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-pix_fmt", "yuv420p", path
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def default_splits(cpu_count):
+    splits = []
+    jobs = 1
+    while jobs <= cpu_count:
+        splits.append((jobs, cpu_count // jobs))
+        jobs *= 2
+    return splits
+
+
+def parse_splits(text):
+    splits = []
+    for part in text.split(","):
+        jobs, threads = part.lower().split("x")
+        splits.append((int(jobs), int(threads)))
+    return splits
+
+
+def run_split(ffmpeg_path, clip_path, work_dir, profile, budget, pin):
+    processes = []
+    start = time.perf_counter()
+    for i, cpus in enumerate(budget.cpu_sets):
+        output_path = os.path.join(work_dir, f"out_{i}.mp4")
+        cmd = build_encode_command(ffmpeg_path, clip_path, output_path, profile, threads=len(cpus))
+        prefix = affinity_prefix(cpus) if pin else []
+        process = subprocess.Popen(prefix + cmd)
+        if pin and not prefix:
+            pin_process(process.pid, cpus)
+        processes.append(process)
+    for process in processes:
+        if process.wait() != 0:
+            raise RuntimeError(f"FFmpeg hibakóddal lépett ki: {process.returncode}")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FFmpeg szálkiosztás benchmark")
+    parser.add_argument("--ffmpeg", default="ffmpeg")
+    parser.add_argument("--profile", default="Közepes", choices=list(PROFILES.keys()))
+    parser.add_argument("--duration", type=int, default=20, help="A tesztklip hossza másodpercben")
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--splits", help="Felosztások, pl. 1x8,2x4,4x2 (feladat x szál)")
+    parser.add_argument("--pin", action="store_true", help="Feladatok rögzítése CPU készletekhez")
+    parser.add_argument("--json", help="Eredmények mentése JSON fájlba")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    profile = PROFILES[args.profile]
+    pin = args.pin and hasattr(os, "sched_setaffinity")
+    budgets = []
+    for jobs, threads in (parse_splits(args.splits) if args.splits else default_splits(len(cpus))):
+        selected = cpus[:jobs * threads]
+        if len(selected) < jobs * threads:
+            print(f"Kihagyva: {jobs}x{threads} (csak {len(cpus)} mag érhető el)")
+            continue
+        budgets.append((f"{jobs}x{threads}", plan_thread_budget(jobs, pending_jobs=jobs, cpus=selected)))
+    auto_budget = plan_thread_budget(1, profile["preset"], auto=True, cpus=cpus)
+    budgets.append((f"auto ({auto_budget.num_jobs}x{auto_budget.threads_for(0)})", auto_budget))
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="vc_bench_") as work_dir:
+        clip_path = os.path.join(work_dir, "clip.mp4")
+        print(f"Tesztklip generálása: {args.resolution}, {args.duration} s")
+        generate_clip(args.ffmpeg, clip_path, args.duration, args.resolution)
+        frames = args.duration * FRAME_RATE
+
+        print(f"{'Felosztás':<16}{'Idő (s)':>10}{'FPS':>10}{'FPS/feladat':>14}")
+        for label, budget in budgets:
+            wall = run_split(args.ffmpeg, clip_path, work_dir, profile, budget, pin)
+            fps = frames * budget.num_jobs / wall
+            print(f"{label:<16}{wall:>10.2f}{fps:>10.1f}{fps / budget.num_jobs:>14.1f}")
+            results.append({
+                "split": label,
+                "jobs": budget.num_jobs,
+                "threads": [len(s) for s in budget.cpu_sets],
+                "wall_sec": round(wall, 3),
+                "fps": round(fps, 2)
+            })
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "profile": args.profile,
+                "preset": profile["preset"],
+                "cpu_count": len(cpus),
+                "duration": args.duration,
+                "resolution": args.resolution,
+                "pinned": pin,
+                "results": results
+            }, f, indent=4)
+    best = max(results, key=lambda r: r["fps"])
+    print(f"Legjobb felosztás: {best['split']} ({best['fps']:.1f} FPS)")
+
+
+if __name__ == "__main__":
+    main()
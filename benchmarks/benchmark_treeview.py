@@ -0,0 +1,104 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_compressor.file_scanner import FileScanner  # noqa: E402
+
+# Fájllista betöltésének és törlésének mérése szintetikus (üres) fájlokkal.
+# A Treeview méréshez grafikus kijelző kell; ennek hiányában csak a bejárás mérődik.
+#
+#   python benchmarks/benchmark_treeview.py --counts 1000,10000,50000
+
+COLUMNS = (
+    "Index", "Fájlnév", "Bemenet (MB)", "Időtartam", "Kész%", "Futás", "Kimenet", "Méret", "Idő", "Tömörítés",
+    "Kezdő Idő", "Végző Idő", "Futásidő", "Státusz", "Típus", "InputPath", "DurationSec"
+)
+
+
+def create_files(directory, count):
+    for i in range(count):
+        open(os.path.join(directory, f"ch_{20240101000000 + i:014d}.mp4"), "wb").close()
+        if i % 10 == 0:
+            open(os.path.join(directory, f"note_{i}.txt"), "wb").close()
+
+
+def scan(directory, batch_size):
+    batches = []
+    done = threading.Event()
+    scanner = FileScanner(directory, on_batch=batches.append, on_done=lambda error: done.set(), batch_size=batch_size)
+    start = time.perf_counter()
+    scanner.start()
+    done.wait()
+    return time.perf_counter() - start, batches
+
+
+def bench_tree(ttk, root, batches):
+    tree = ttk.Treeview(root, columns=COLUMNS, show="headings")
+    tree.pack()
+    start = time.perf_counter()
+    index = 0
+    for batch in batches:
+        for name, path, size, _ in batch:
+            index += 1
+            tree.insert("", "end", values=(index, name, f"{size / (1024 * 1024):.1f}", "-", "-", "-", "-", "-", "-", "-",
+                                           "-", "-", "-", "Készenlét", "-", path, "-"))
+        root.update()
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree.delete(*tree.get_children())
+    root.update()
+    bulk_clear = time.perf_counter() - start
+
+    for batch in batches:
+        for name, path, size, _ in batch:
+            tree.insert("", "end", values=(0, name, "-", "-", "-", "-", "-", "-", "-", "-", "-", "-", "-", "-", "-", path, "-"))
+    root.update()
+    start = time.perf_counter()
+    for item in tree.get_children():
+        tree.delete(item)
+    root.update()
+    single_clear = time.perf_counter() - start
+    tree.destroy()
+    return load, bulk_clear, single_clear
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treeview betöltés/törlés benchmark")
+    parser.add_argument("--counts", default="1000,10000,50000")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    root = None
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"Nincs elérhető kijelző, csak a bejárás mérése: {e}")
+
+    print(f"{'Fájlok':>8}{'Bejárás (s)':>14}{'Betöltés (s)':>14}{'Törlés, tömeges (s)':>22}{'Törlés, egyesével (s)':>24}")
+    for count in (int(c) for c in args.counts.split(",")):
+        with tempfile.TemporaryDirectory(prefix="vc_tree_") as directory:
+            create_files(directory, count)
+            scan_time, batches = scan(directory, args.batch_size)
+            found = sum(len(b) for b in batches)
+            if found != count:
+                raise RuntimeError(f"Várt {count} fájl, talált {found}")
+            if root is None:
+                print(f"{count:>8}{scan_time:>14.3f}{'-':>14}{'-':>22}{'-':>24}")
+                continue
+            load, bulk_clear, single_clear = bench_tree(ttk, root, batches)
+            print(f"{count:>8}{scan_time:>14.3f}{load:>14.3f}{bulk_clear:>22.3f}{single_clear:>24.3f}")
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
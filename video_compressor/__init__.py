@@ -0,0 +1 @@
+# Videó tömörítő motor: a Tkinter felülettől független feldolgozó modulok.
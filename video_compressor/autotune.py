@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cél minőség (SSIM, 0..1); térfigyelő felvételeknél 0.97 felett szemmel nem látható a különbség
+TARGET_SSIM = 0.97
+# Jelöltek a legolcsóbbtól (legkisebb kimenet, leggyorsabb preset) a legdrágábbig
+CANDIDATES = (
+    {"crf": "32", "preset": "veryfast"},
+    {"crf": "30", "preset": "fast"},
+    {"crf": "28", "preset": "fast"},
+    {"crf": "26", "preset": "medium"},
+    {"crf": "23", "preset": "medium"},
+    {"crf": "20", "preset": "slow"}
+)
+SAMPLE_COUNT = 3
+SAMPLE_SEC = 4.0
+SAMPLE_TIMEOUT = 120
+CACHE_ENTRY_MAX_AGE = 30 * 24 * 3600
+SSIM_PATTERN = re.compile(r"All:\s*([0-9.]+)")
+# ch01_..., ch_... (szám nélküli csatorna) és elválasztó nélküli ch0120240115223000 alak
+CHANNEL_PATTERN = re.compile(r"^(ch\d*)(?=[_-]|\d{14})", re.IGNORECASE)
+DIGITS_PATTERN = re.compile(r"\d{4,}")
+
+
+# --- Forrás (kamera) azonosító: csatornanév vagy a fájlnév az időbélyegek nélkül, mappával és felbontással ---
+def source_key(input_path, metadata=None):
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    match = CHANNEL_PATTERN.match(stem)
+    pattern = match.group(1).lower() if match else DIGITS_PATTERN.sub("#", stem)
+    height = (metadata or {}).get("height") or "?"
+    return f"{os.path.dirname(os.path.abspath(input_path))}|{pattern}|{height}"
+
+
+# --- Mintavételi pontok a felvétel belsejében (az eleje és a vége gyakran nem jellemző) ---
+def sample_points(duration, count=SAMPLE_COUNT, length=SAMPLE_SEC):
+    if not duration or duration <= length:
+        return [0.0]
+    count = max(1, min(count, int(duration // length)))
+    return [max(0.0, duration * (i + 1) / (count + 1) - length / 2) for i in range(count)]
+
+
+# --- Forrásonkénti döntések tartós tárolása ---
+class AutoProfileCache:
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+                logger.info(f"Automatikus profil gyorsítótár betöltve: {len(self._entries)} forrás")
+        except Exception as e:
+            logger.error(f"Hiba az automatikus profil gyorsítótár betöltésekor: {e}")
+            self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.time() - entry.get("time", 0) > CACHE_ENTRY_MAX_AGE:
+            return None
+        return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = dict(entry, time=time.time())
+        self.save()
+
+    def save(self):
+        try:
+            with self._lock:
+                snapshot = dict(self._entries)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Hiba az automatikus profil gyorsítótár mentésekor: {e}")
+
+
+# --- CRF/preset választás rövid minták kódolásával és SSIM méréssel ---
+# Ugyanarról a forrásról egyszerre csak egy mintavétel fut; a többi feladat megvárja és a gyorsítótárat használja.
+class AutoTuner:
+    def __init__(self, ffmpeg_path, cache, target_ssim=TARGET_SSIM, candidates=CANDIDATES):
+        self.ffmpeg_path = ffmpeg_path
+        self.cache = cache
+        self.target_ssim = target_ssim
+        self.candidates = candidates
+        self._lock = threading.Lock()
+        self._source_locks = {}
+
+    # run: (cmd, timeout) -> (kilépési kód, hibakimenet); az ütemező így regisztrálja a mintavételi
+    # folyamatokat, hogy a szünet és a megszakítás is elérje őket
+    def choose(self, input_path, duration, metadata=None, threads=None, run=None):
+        key = source_key(input_path, metadata)
+        with self._lock:
+            source_lock = self._source_locks.setdefault(key, threading.Lock())
+        with source_lock:
+            entry = self.cache.get(key) if self.cache else None
+            if entry is not None:
+                logger.info(f"Automatikus profil a gyorsítótárból: {input_path}: crf {entry['crf']}, {entry['preset']}")
+                return {"crf": entry["crf"], "preset": entry["preset"]}
+            entry = self._sample(input_path, duration, threads, run)
+            if self.cache:
+                self.cache.put(key, entry)
+        return {"crf": entry["crf"], "preset": entry["preset"]}
+
+    def _sample(self, input_path, duration, threads, run=None):
+        points = sample_points(duration)
+        work_dir = tempfile.mkdtemp(prefix="autotune_")
+        try:
+            chosen = None
+            for candidate in self.candidates:
+                ssim, size = self._measure(input_path, points, candidate, threads, work_dir, run)
+                logger.debug("Minta: %s: crf %s, %s: SSIM %.4f, %d bájt", input_path, candidate["crf"],
+                             candidate["preset"], ssim, size)
+                chosen = dict(candidate, ssim=round(ssim, 5), sample_bytes=size)
+                if ssim >= self.target_ssim:
+                    break
+            logger.info(f"Automatikus profil: {input_path}: crf {chosen['crf']}, {chosen['preset']} (SSIM {chosen['ssim']})")
+            return chosen
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    # A minták átlagos SSIM értéke és összes mérete egy jelöltnél
+    def _measure(self, input_path, points, candidate, threads, work_dir, run=None):
+        scores = []
+        total_size = 0
+        for i, start in enumerate(points):
+            sample_path = os.path.join(work_dir, f"sample_{i}.mp4")
+            cmd = [self.ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error"]
+            if threads:
+                cmd += ["-threads", str(threads)]
+            cmd += ["-ss", f"{start:.3f}", "-i", input_path, "-t", f"{SAMPLE_SEC:.3f}", "-an",
+                    "-c:v", "libx264", "-preset", candidate["preset"], "-crf", str(candidate["crf"]), sample_path]
+            self._run(cmd, run)
+            total_size += os.path.getsize(sample_path)
+            # A minta (torz) és az ugyanonnan vágott forrás (referencia) összevetése
+            cmd = [self.ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "info",
+                   "-i", sample_path, "-ss", f"{start:.3f}", "-t", f"{SAMPLE_SEC:.3f}", "-i", input_path,
+                   "-lavfi", "[0:v][1:v]ssim", "-f", "null", "-"]
+            output = self._run(cmd, run)
+            match = SSIM_PATTERN.search(output)
+            if match is None:
+                raise RuntimeError("Az SSIM érték nem olvasható az FFmpeg kimenetéből")
+            scores.append(float(match.group(1)))
+        return sum(scores) / len(scores), total_size
+
+    def _run(self, cmd, run=None):
+        if run is not None:
+            returncode, output = run(cmd, SAMPLE_TIMEOUT)
+        else:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=SAMPLE_TIMEOUT)
+            returncode, output = result.returncode, result.stderr.decode("utf-8", errors="replace")
+        if returncode != 0:
+            raise RuntimeError(output.strip()[-500:] or f"ffmpeg hibakód: {returncode}")
+        return output
@@ -0,0 +1,54 @@
+import logging
+import os
+import threading
+
+from .file_scanner import FileScanner
+from .metadata import MetadataScanner
+from .profiles import build_output_path
+from .scheduler import EncodeJob
+
+logger = logging.getLogger(__name__)
+
+
+# --- Tk nélküli segédfüggvények: a grafikus felület és a parancssoros futtató közös motorja ---
+
+# --- Feladat létrehozása; None, ha a kimenet felülírná a bemenetet ---
+# taken: kötegenként közös halmaz, így két bemenet nem kaphatja ugyanazt a kimeneti fájlt
+def make_job(job_id, input_path, output_dir, duration_sec=None, metadata=None, taken=None):
+    output_path = build_output_path(input_path, output_dir)
+    if os.path.abspath(output_path) == os.path.abspath(input_path):
+        logger.warning(f"A kimenet felülírná a bemenetet, kihagyva: {input_path}")
+        return None
+    if taken is not None:
+        unique_path = build_output_path(input_path, output_dir, taken)
+        if unique_path != output_path:
+            logger.warning(f"Azonos nevű kimenet a kötegben, egyedi név: {input_path} -> {unique_path}")
+            output_path = unique_path
+    return EncodeJob(job_id, input_path, output_path, duration_sec=duration_sec, metadata=metadata)
+
+
+# --- Mappa bejárása a hívó szálon; (név, útvonal, méret, indexbejegyzés) sorok ---
+def scan_directory(directory, index=None):
+    rows = []
+    errors = []
+    scanner = FileScanner(directory, on_batch=rows.extend, on_done=errors.append, index=index)
+    scanner.start()
+    scanner.wait()
+    if errors and errors[0]:
+        raise OSError(errors[0])
+    return rows
+
+
+# --- Metaadatok beolvasása a hívó szálon; kulcs -> metaadat (hiba esetén None) ---
+def probe_all(ffprobe_path, cache, items):
+    results = {}
+    lock = threading.Lock()
+
+    def on_result(key, path, meta, error):
+        with lock:
+            results[key] = meta
+
+    scanner = MetadataScanner(ffprobe_path, cache, on_result=on_result)
+    scanner.start(items)
+    scanner.wait()
+    return results
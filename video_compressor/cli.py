@@ -0,0 +1,375 @@
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+
+from .autotune import AutoProfileCache, AutoTuner
+from .batch import make_job, probe_all, scan_directory
+from .decision import PASSTHROUGH_MODES
+from .eta import EtaEstimator, SpeedHistory
+from .fingerprint import FingerprintIndex
+from .journal import JobJournal, recover_journal
+from .log_setup import LOG_LEVELS, configure_logging, set_log_level
+from .metadata import MetadataCache
+from .preview import PreviewCache, PreviewGenerator
+from .profiles import PROFILES
+from .reports import REPORT_FORMATS, ReportWriter, enabled_formats
+from .scheduler import (
+    JobScheduler, ORDER_CHRONOLOGICAL, ORDER_SIZE, STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED, STATUS_CANCELLED,
+    STATUS_LABELS, EVENT_JOB_STARTED, EVENT_JOB_FINISHED
+)
+from .timestamps import FILE_TYPE_CH, FILE_TYPE_OTHER, TimestampIndex, parse_time
+from .timing import STAGE_PROBE, STAGE_REPORT, STAGE_SCAN, SpanRecorder
+from .work_share import DEFAULT_LEASE_SEC, SharedJobQueue, write_merged_report
+from .settings import (
+    SETTINGS_FILE, METADATA_CACHE_FILE, SPEED_HISTORY_FILE, JOURNAL_FILE, AUTO_PROFILE_CACHE_FILE, PREVIEW_CACHE_DIR,
+    load_settings
+)
+
+logger = logging.getLogger(__name__)
+
+# --- Kilépési kódok ---
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+DEFAULT_PROGRESS_INTERVAL = 5.0
+
+
+# --- Gépi feldolgozásra szánt kimenet: soronként egy JSON objektum a szabványos kimeneten ---
+class ProgressWriter:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        record = {"event": event, "time": round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def job_record(job):
+    return {
+        "input": job.input_path,
+        "output": job.output_path,
+        "status": job.status,
+        "action": job.action,
+        "size": job.size_bytes,
+        "output_size": job.output_size,
+        "runtime": round(job.runtime(), 3) if job.start_time else None,
+        "threads": job.threads,
+        "error": job.error
+    }
+
+
+def parse_formats(value):
+    formats = [fmt.strip().lower() for fmt in value.split(",") if fmt.strip()]
+    if formats == ["none"]:
+        return []
+    unknown = [fmt for fmt in formats if fmt not in REPORT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"ismeretlen formátum: {', '.join(unknown)}")
+    return formats
+
+
+def parse_time_arg(value):
+    try:
+        return parse_time(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="video_compressor",
+        description="Videók kötegelt tömörítése grafikus felület nélkül (a beállítások a settings.json-ból jönnek).")
+    parser.add_argument("-i", "--input-dir", help="bemeneti mappa")
+    parser.add_argument("-o", "--output-dir", help="kimeneti mappa")
+    parser.add_argument("-p", "--profile", choices=sorted(PROFILES), help="tömörítési profil")
+    parser.add_argument("-j", "--workers", type=int, help="párhuzamos kódolások száma")
+    parser.add_argument("--auto-threads", action="store_true", default=None,
+                        help="a párhuzamosság automatikus meghatározása a CPU-k alapján")
+    parser.add_argument("--pin-cpus", action="store_true", default=None, help="kódolások CPU-magokhoz kötése")
+    parser.add_argument("--segment-threshold", type=int, metavar="PERC",
+                        help="ennél hosszabb felvételek darabolt, párhuzamos kódolása (perc)")
+    parser.add_argument("--passthrough", choices=PASSTHROUGH_MODES,
+                        help="újrakódolást nem érdemlő fájlok: off = kódolás, remux = átcsomagolás, skip = kihagyás")
+    parser.add_argument("--scratch-dir", help="gyors helyi átmeneti mappa; a kész kimenetek innen kerülnek a kimeneti mappába")
+    parser.add_argument("--log-dir", help="jelentések mappája (alapértelmezés: a kimeneti mappa)")
+    parser.add_argument("--log-formats", type=parse_formats, metavar="FORMÁTUMOK",
+                        help=f"vesszővel elválasztott jelentésformátumok ({','.join(REPORT_FORMATS)}) vagy 'none'")
+    parser.add_argument("--file-type", choices=(FILE_TYPE_CH, FILE_TYPE_OTHER),
+                        help="fájlnév séma: ch = chNN_YYYYMMDDHHMMSS, other = [név_]YYYY_MMDD_HHMMSS")
+    parser.add_argument("--from", dest="range_from", type=parse_time_arg, metavar="IDŐPONT",
+                        help="csak az ekkor vagy később kezdődő felvételek (ÉÉÉÉ-HH-NN[ ÓÓ:PP[:MM]])")
+    parser.add_argument("--to", dest="range_to", type=parse_time_arg, metavar="IDŐPONT",
+                        help="csak az ez előtt kezdődő felvételek")
+    parser.add_argument("--channel", action="append", help="csak a megadott csatorna (többször is megadható)")
+    parser.add_argument("--chronological", action="store_true", default=None,
+                        help="feldolgozás a felvételek időrendjében (alapértelmezés: leghosszabb először)")
+    parser.add_argument("--shared-queue", metavar="MAPPA",
+                        help="közös feladatsor mappa: több gép/példány együtt dolgozza fel a bemeneti mappát")
+    parser.add_argument("--node-id", help="a példány neve a közös sorban (alapértelmezés: gépnév-PID)")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SEC, metavar="MP",
+                        help="ennyi frissítés nélküli idő után egy foglalást más gép átvehet (alapértelmezés: %(default)s)")
+    parser.add_argument("--queue-status", action="store_true",
+                        help="a közös sor összesített állapotának kiírása (JSON sor) feldolgozás nélkül")
+    parser.add_argument("--merge-reports", action="store_true",
+                        help="összesített jelentés a közös sor összes gépének eredményeiből, feldolgozás nélkül")
+    parser.add_argument("--previews", action="store_true",
+                        help="csak előnézetek (bélyegkép sáv és rövid klip) készítése a kiválasztott fájlokhoz, tömörítés nélkül")
+    parser.add_argument("--ffmpeg", help="FFmpeg futtatható fájl")
+    parser.add_argument("--ffprobe", help="FFprobe futtatható fájl")
+    parser.add_argument("--settings", default=SETTINGS_FILE, help="beállításfájl (alapértelmezés: %(default)s)")
+    parser.add_argument("--no-resume", action="store_true", help="a feladatnapló figyelmen kívül hagyása")
+    parser.add_argument("--progress-interval", type=float, default=DEFAULT_PROGRESS_INTERVAL, metavar="MP",
+                        help="haladási sorok gyakorisága másodpercben (alapértelmezés: %(default)s)")
+    parser.add_argument("--timings", metavar="FÁJL", help="szakaszonkénti időmérés mentése JSON fájlba")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, help="naplózási szint (alapértelmezés: a beállításfájlból)")
+    parser.add_argument("--log-file", metavar="FÁJL", help="forgó naplófájl (alapértelmezés: csak a hibakimenet)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="részletes naplózás a hibakimenetre (DEBUG)")
+    return parser
+
+
+# --- A parancssori kapcsolók felülírják a mentett beállításokat ---
+def resolve_settings(args):
+    settings = load_settings(args.settings)
+    overrides = {
+        "input_dir": args.input_dir,
+        "output_dir": args.output_dir,
+        "log_output_dir": args.log_dir,
+        "scratch_dir": args.scratch_dir,
+        "selected_profile_name": args.profile,
+        "num_threads": args.workers,
+        "auto_threads": args.auto_threads,
+        "pin_cpus": args.pin_cpus,
+        "passthrough_mode": args.passthrough,
+        "file_type_choice": args.file_type,
+        "chronological_order": args.chronological,
+        "shared_queue_dir": args.shared_queue,
+        "node_id": args.node_id,
+        "ffmpeg_path": args.ffmpeg,
+        "ffprobe_path": args.ffprobe
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    if args.log_formats is not None:
+        settings.update({f"{fmt}_log": fmt in args.log_formats for fmt in REPORT_FORMATS})
+    if args.segment_threshold is not None:
+        settings["segment_mode"] = args.segment_threshold > 0
+        settings["segment_threshold_min"] = args.segment_threshold
+    return settings
+
+
+def open_shared_queue(settings, lease_sec=DEFAULT_LEASE_SEC):
+    if not settings["shared_queue_dir"]:
+        return None
+    return SharedJobQueue(settings["shared_queue_dir"], settings["input_dir"] or ".", node_id=settings["node_id"] or None,
+                          lease_sec=lease_sec)
+
+
+def run(settings, progress, resume=True, progress_interval=DEFAULT_PROGRESS_INTERVAL, selection=None,
+        timings_path=None, lease_sec=DEFAULT_LEASE_SEC):
+    input_dir = settings["input_dir"]
+    output_dir = settings["output_dir"]
+    profile_name = settings["selected_profile_name"]
+    timings = SpanRecorder()
+
+    index = FingerprintIndex(settings["log_output_dir"] or output_dir, profile_name)
+    with timings.span(input_dir, STAGE_SCAN):
+        rows = scan_directory(input_dir, index=index)
+    session_state = recover_journal(JOURNAL_FILE) if resume else {}
+    # Időbélyeg index a fájlnevekből: időrendi sorrend és időszak/csatorna szerinti szűrés FFprobe nélkül
+    timestamps = TimestampIndex(settings["file_type_choice"]).build((path, name) for name, path, _, _ in rows)
+    selected = set(timestamps.select(*selection)) if selection else None
+    pending = []
+    for _, path, _, _ in rows:
+        if selected is not None and path not in selected:
+            continue
+        record = session_state.get(path)
+        if record and record["state"] == STATUS_DONE:
+            continue
+        pending.append((path, path))
+    with timings.span(input_dir, STAGE_PROBE):
+        metadata = probe_all(settings["ffprobe_path"], MetadataCache(METADATA_CACHE_FILE), pending)
+
+    journal = JobJournal(JOURNAL_FILE)
+    speed_history = SpeedHistory(SPEED_HISTORY_FILE)
+    estimator = EtaEstimator(speed_history, profile_name)
+    formats = enabled_formats(settings)
+    report = ReportWriter(settings["log_output_dir"] or output_dir, formats,
+                          status_labels=STATUS_LABELS) if formats else None
+    shared_queue = open_shared_queue(settings, lease_sec)
+
+    def on_event(event, job):
+        if event == EVENT_JOB_STARTED:
+            progress.emit(event, input=job.input_path)
+        elif event == EVENT_JOB_FINISHED:
+            if job.status == STATUS_DONE:
+                estimator.record_job(job)
+            if report is not None:
+                with timings.span(job.input_path, STAGE_REPORT):
+                    report.write_job(job)
+            progress.emit(event, **job_record(job))
+
+    segment_threshold = settings["segment_threshold_min"] * 60 if settings["segment_mode"] else None
+    profile = PROFILES[profile_name]
+    autotuner = AutoTuner(settings["ffmpeg_path"], AutoProfileCache(AUTO_PROFILE_CACHE_FILE)) if profile.get("auto") else None
+    scheduler = JobScheduler(settings["ffmpeg_path"], profile, settings["num_threads"],
+                             on_event=on_event, auto_threads=settings["auto_threads"], pin_cpus=settings["pin_cpus"],
+                             journal=journal, index=index, ffprobe_path=settings["ffprobe_path"],
+                             segment_threshold_sec=segment_threshold, autotuner=autotuner,
+                             passthrough_mode=settings["passthrough_mode"], scratch_dir=settings["scratch_dir"],
+                             order=ORDER_CHRONOLOGICAL if settings["chronological_order"] else ORDER_SIZE,
+                             timings=timings, shared_queue=shared_queue)
+    taken = set()
+    for path, _ in pending:
+        meta = metadata.get(path)
+        job = make_job(path, path, output_dir, duration_sec=meta.get("duration") if meta else None, metadata=meta,
+                       taken=taken)
+        if job is not None:
+            job.recorded_at = timestamps.start_of(path)
+            scheduler.add_job(job)
+
+    previous_handlers = {}
+
+    def on_signal(signum, frame):
+        logger.warning(f"Megszakítás jelzés ({signum}), futó kódolások leállítása")
+        scheduler.cancel()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous_handlers[signum] = signal.signal(signum, on_signal)
+
+    started = time.time()
+    if shared_queue is not None:
+        shared_queue.start()
+    try:
+        progress.emit("batch_started", input_dir=input_dir, output_dir=output_dir, profile=profile_name,
+                      files=len(rows), jobs=len(scheduler.jobs))
+        if scheduler.jobs:
+            scheduler.start()
+            progress.emit("workers", workers=scheduler.num_workers)
+            while not scheduler.wait(progress_interval):
+                remaining = estimator.remaining_seconds(scheduler)
+                progress.emit("progress", percent=round(100.0 * scheduler.overall_fraction(), 2),
+                              running=[job.input_path for job in scheduler.running_jobs()],
+                              eta_sec=round(remaining) if remaining is not None else None)
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        journal.close()
+        speed_history.save()
+        if shared_queue is not None:
+            shared_queue.close()
+
+    counts = {status: sum(1 for job in scheduler.jobs if job.status == status)
+              for status in (STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED, STATUS_CANCELLED)}
+    if report is not None:
+        report.close(dict(counts, files=len(scheduler.jobs), interrupted=scheduler.is_cancelled()))
+    if timings_path:
+        timings.export_json(timings_path)
+    if shared_queue is not None:
+        progress.emit("shared_queue", node=shared_queue.node_id, **shared_queue.status())
+    progress.emit("batch_finished", elapsed=round(time.time() - started, 3), interrupted=scheduler.is_cancelled(),
+                  **counts)
+    if scheduler.is_cancelled():
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if counts[STATUS_FAILED] else EXIT_OK
+
+
+# --- Gyors előnézetek alacsony prioritással; a már elkészültek a gyorsítótárból jönnek ---
+def run_previews(settings, progress, selection=None):
+    input_dir = settings["input_dir"]
+    rows = scan_directory(input_dir)
+    timestamps = TimestampIndex(settings["file_type_choice"]).build((path, name) for name, path, _, _ in rows)
+    selected = set(timestamps.select(*selection)) if selection else None
+    paths = [path for _, path, _, _ in rows if selected is None or path in selected]
+    metadata = probe_all(settings["ffprobe_path"], MetadataCache(METADATA_CACHE_FILE), [(path, path) for path in paths])
+    failed = []
+
+    def on_done(key, input_path, result, error):
+        if error:
+            failed.append(input_path)
+        progress.emit("preview", input=input_path, error=error, **(result or {}))
+
+    generator = PreviewGenerator(settings["ffmpeg_path"], PreviewCache(PREVIEW_CACHE_DIR), on_done=on_done)
+    progress.emit("batch_started", input_dir=input_dir, files=len(paths), previews=True)
+    started = time.time()
+    try:
+        for path in paths:
+            meta = metadata.get(path)
+            generator.request(path, path, duration=meta.get("duration") if meta else None)
+        generator.wait()
+    except KeyboardInterrupt:
+        generator.close()
+        progress.emit("batch_finished", elapsed=round(time.time() - started, 3), interrupted=True)
+        return EXIT_INTERRUPTED
+    generator.close()
+    progress.emit("batch_finished", elapsed=round(time.time() - started, 3), interrupted=False, failed=len(failed))
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+# --- Közös sor lekérdezése: összesített állapot vagy jelentés az összes gép eredményeiből ---
+def shared_queue_command(settings, args):
+    if not settings["shared_queue_dir"]:
+        logger.error("A --queue-status és a --merge-reports a --shared-queue kapcsolóval használható")
+        return EXIT_USAGE
+    try:
+        shared_queue = open_shared_queue(settings, args.lease)
+        if args.queue_status:
+            ProgressWriter().emit("shared_queue", **shared_queue.status())
+        if args.merge_reports:
+            directory = settings["log_output_dir"] or settings["output_dir"]
+            formats = enabled_formats(settings)
+            if not directory or not formats:
+                logger.error("Az összesített jelentéshez kimeneti (vagy napló) mappa és jelentésformátum kell")
+                return EXIT_USAGE
+            writer = ReportWriter(directory, formats, name=time.strftime("tomorites_osszesitett_%Y%m%d_%H%M%S"))
+            rows = write_merged_report(shared_queue, writer, STATUS_LABELS)
+            writer.close({"Fájlok": rows})
+        shared_queue.close()
+    except OSError as e:
+        logger.error(f"Hiba a közös feladatsor olvasásakor: {e}")
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # A szabványos kimenet a haladási soroké, a napló a hibakimenetre (és kérésre forgó naplófájlba) megy
+    configure_logging(level="DEBUG" if args.verbose else args.log_level or "INFO", log_file=args.log_file,
+                      stream=sys.stderr)
+    try:
+        settings = resolve_settings(args)
+    except (OSError, ValueError) as e:
+        logger.error(f"Hiba a beállítások betöltésekor: {e}")
+        return EXIT_USAGE
+    if not args.verbose and not args.log_level:
+        set_log_level(settings["log_level"])
+    if args.queue_status or args.merge_reports:
+        return shared_queue_command(settings, args)
+    required = [("input_dir", "--input-dir")] + ([] if args.previews else [("output_dir", "--output-dir")])
+    for key, option in required:
+        if not settings[key]:
+            logger.error(f"Hiányzó mappa: adja meg a(z) {option} kapcsolót vagy a beállításfájlban")
+            return EXIT_USAGE
+    if settings["num_threads"] < 1:
+        logger.error("A párhuzamos kódolások száma legalább 1 kell legyen")
+        return EXIT_USAGE
+    try:
+        selection = None
+        if args.range_from is not None or args.range_to is not None or args.channel:
+            selection = (args.range_from, args.range_to, args.channel)
+        if args.previews:
+            return run_previews(settings, ProgressWriter(), selection=selection)
+        return run(settings, ProgressWriter(), resume=not args.no_resume, progress_interval=args.progress_interval,
+                   selection=selection, timings_path=args.timings, lease_sec=args.lease)
+    except OSError as e:
+        logger.error(f"Hiba a feldolgozás közben: {e}")
+        return EXIT_FAILED
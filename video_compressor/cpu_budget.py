@@ -0,0 +1,80 @@
+import logging
+import os
+import shutil
+
+logger = logging.getLogger(__name__)
+
+# --- Szálak száma feladatonként presetenként (automatikus mód) ---
+# A gyors presetek egy példányon belül rosszul skálázódnak, ezért ott több
+# párhuzamos feladat kevesebb szállal adja a legjobb összteljesítményt.
+PRESET_THREADS_PER_JOB = {
+    "ultrafast": 1,
+    "superfast": 1,
+    "veryfast": 2,
+    "faster": 2,
+    "fast": 2,
+    "medium": 4,
+    "slow": 6,
+    "slower": 8,
+    "veryslow": 8
+}
+DEFAULT_THREADS_PER_JOB = 4
+
+
+# --- A folyamat számára elérhető magok ---
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+# --- CPU kötés indításkor; a preexec_fn szálakat futtató folyamatban nem biztonságos ---
+# A taskset még az exec előtt beállítja az affinitást (a PID nem változik), így az FFmpeg minden szála örökli
+def affinity_prefix(cpus):
+    taskset = shutil.which("taskset") if os.name == "posix" else None
+    return [taskset, "-c", ",".join(str(cpu) for cpu in cpus)] if taskset else []
+
+
+# taskset hiányában az elindult folyamat kötése (a korán létrehozott szálai kimaradhatnak)
+def pin_process(pid, cpus):
+    try:
+        os.sched_setaffinity(pid, cpus)
+    except OSError as e:
+        logger.debug("CPU kötés sikertelen (PID %s): %s", pid, e)
+
+
+# --- A magok felosztása a párhuzamos feladatok között ---
+class ThreadBudget:
+    def __init__(self, cpu_sets):
+        self.cpu_sets = cpu_sets
+
+    @property
+    def num_jobs(self):
+        return len(self.cpu_sets)
+
+    def threads_for(self, worker_index):
+        return len(self.cpu_sets[worker_index])
+
+    def __repr__(self):
+        return f"ThreadBudget(jobs={self.num_jobs}, threads={[len(s) for s in self.cpu_sets]})"
+
+
+def plan_thread_budget(requested_jobs, preset=None, auto=False, pending_jobs=None, cpus=None):
+    cpus = list(cpus) if cpus else available_cpus()
+    if auto:
+        threads = min(len(cpus), PRESET_THREADS_PER_JOB.get(preset, DEFAULT_THREADS_PER_JOB))
+        jobs = max(1, len(cpus) // threads)
+    else:
+        jobs = max(1, min(int(requested_jobs), len(cpus)))
+    if pending_jobs:
+        jobs = min(jobs, pending_jobs)
+
+    # A maradék magokat az első feladatok kapják, így egy mag sem marad kihasználatlanul
+    base, extra = divmod(len(cpus), jobs)
+    cpu_sets = []
+    start = 0
+    for i in range(jobs):
+        count = base + (1 if i < extra else 0)
+        cpu_sets.append(cpus[start:start + count])
+        start += count
+    return ThreadBudget(cpu_sets)
@@ -0,0 +1,73 @@
+import os
+
+ACTION_ENCODE = "encode"
+ACTION_REMUX = "remux"
+ACTION_SKIP = "skip"
+ACTION_ORIGINAL = "original"
+ACTION_LABELS = {
+    ACTION_ENCODE: "Kódolás",
+    ACTION_REMUX: "Átcsomagolás",
+    ACTION_SKIP: "Kihagyva",
+    ACTION_ORIGINAL: "Eredeti"
+}
+
+# Újrakódolás elkerülésének módja: kikapcsolva, átcsomagolás (stream copy) vagy kihagyás
+PASSTHROUGH_OFF = "off"
+PASSTHROUGH_REMUX = "remux"
+PASSTHROUGH_SKIP = "skip"
+PASSTHROUGH_MODES = (PASSTHROUGH_OFF, PASSTHROUGH_REMUX, PASSTHROUGH_SKIP)
+
+# Ha a becsült kimenet nem legalább ennyivel kisebb, nem éri meg újrakódolni
+MIN_SAVING_RATIO = 0.15
+# x264 képpontonkénti bitek száma CRF 23-nál; 6 CRF lépés kb. feleződés/duplázás
+REFERENCE_CRF = 23
+REFERENCE_BITS_PER_PIXEL = 0.06
+AUDIO_BIT_RATE = 128000
+DEFAULT_FRAME_RATE = 25.0
+# MP4 tárolóba stream copy-val átvihető kodekek
+MP4_VIDEO_CODECS = {"h264", "hevc", "av1", "mpeg4"}
+MP4_AUDIO_CODECS = {None, "aac", "mp3", "ac3", "eac3", "alac", "opus"}
+# A célkodeknél (H.264) hatékonyabb kodekek: ezekből újrakódolás szinte mindig nagyobb fájlt ad
+EFFICIENT_CODECS = {"hevc", "av1", "vp9"}
+
+
+# --- Várható kimeneti bitráta a profil CRF-je és a forrás felbontása alapján ---
+def predict_bit_rate(metadata, profile):
+    width, height = metadata.get("width"), metadata.get("height")
+    if not width or not height:
+        return None
+    fps = metadata.get("frame_rate") or DEFAULT_FRAME_RATE
+    bpp = REFERENCE_BITS_PER_PIXEL * 2 ** ((REFERENCE_CRF - float(profile["crf"])) / 6.0)
+    audio = AUDIO_BIT_RATE if metadata.get("audio_codec") else 0
+    return bpp * width * height * fps + audio
+
+
+def can_remux(metadata):
+    return metadata.get("video_codec") in MP4_VIDEO_CODECS and metadata.get("audio_codec") in MP4_AUDIO_CODECS
+
+
+# --- Döntés: kódolás, átcsomagolás vagy kihagyás; visszatér: (művelet, indoklás) ---
+def decide(metadata, profile, mode=PASSTHROUGH_OFF, min_saving=MIN_SAVING_RATIO):
+    if mode == PASSTHROUGH_OFF or not metadata:
+        return ACTION_ENCODE, None
+    source_rate = metadata.get("bit_rate")
+    predicted = predict_bit_rate(metadata, profile)
+    codec = metadata.get("video_codec")
+    if codec in EFFICIENT_CODECS:
+        reason = f"már hatékony kodek ({codec})"
+    elif source_rate and predicted and predicted >= source_rate * (1.0 - min_saving):
+        reason = f"becsült megtakarítás {100.0 * (1.0 - predicted / source_rate):.0f}%"
+    else:
+        return ACTION_ENCODE, None
+    if mode == PASSTHROUGH_SKIP:
+        return ACTION_SKIP, reason
+    if can_remux(metadata):
+        return ACTION_REMUX, reason
+    # Nem vihető át MP4-be: marad a kódolás
+    return ACTION_ENCODE, None
+
+
+# --- Az eredetit megtartó kimenet útvonala, ha az átcsomagolás nem lehetséges ---
+# A feladat (egyedi) kimeneti neve az eredeti kiterjesztéssel, így nem ütközhet más bemenet kimenetével
+def original_copy_path(input_path, output_path):
+    return os.path.splitext(output_path)[0] + os.path.splitext(input_path)[1]
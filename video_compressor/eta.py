@@ -0,0 +1,145 @@
+import heapq
+import json
+import logging
+import os
+import threading
+
+from .decision import ACTION_ENCODE, ACTION_REMUX
+from .scheduler import STATUS_QUEUED, STATUS_RUNNING
+
+logger = logging.getLogger(__name__)
+
+ETA_EMA_ALPHA = 0.3
+RESOLUTION_CLASSES = ((480, "sd"), (720, "720p"), (1080, "1080p"), (1440, "1440p"))
+# Az átcsomagolás (stream másolás) sebessége nem függ a profiltól és a szálszámtól, saját kulcson tárolódik
+REMUX_KEY = "remux"
+# Átcsomagolás becsült sebessége (mp / fali mp), amíg nincs rá mért adat
+DEFAULT_REMUX_SPEED = 100.0
+
+
+# --- Felbontás osztály a magasság alapján ---
+def resolution_class(height):
+    if not height:
+        return "unknown"
+    for limit, label in RESOLUTION_CLASSES:
+        if height <= limit:
+            return label
+    return "2160p"
+
+
+def speed_keys(profile_name, height, threads, action=ACTION_ENCODE):
+    # A pontos kulcs a szálszámot is tartalmazza, a durva kulcs csak profil és felbontás
+    res = resolution_class(height)
+    if action == ACTION_REMUX:
+        return [f"{REMUX_KEY}|{res}", REMUX_KEY]
+    return [f"{profile_name}|{res}|{threads}", f"{profile_name}|{res}", profile_name]
+
+
+# --- Valós idejű sebességek (kódolt mp / fali mp) tartós, simított tárolása ---
+class SpeedHistory:
+    def __init__(self, path, alpha=ETA_EMA_ALPHA):
+        self.path = path
+        self.alpha = alpha
+        self._speeds = {}
+        self._lock = threading.Lock()
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self._speeds = json.load(f)
+                logger.info(f"Sebesség előzmények betöltve: {len(self._speeds)} bejegyzés")
+        except Exception as e:
+            logger.error(f"Hiba a sebesség előzmények betöltésekor: {e}")
+            self._speeds = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._speeds.get(key)
+        return entry["speed"] if entry else None
+
+    def update(self, key, speed):
+        with self._lock:
+            entry = self._speeds.get(key)
+            if entry is None:
+                entry = {"speed": speed, "samples": 0}
+            else:
+                entry["speed"] = self.alpha * speed + (1 - self.alpha) * entry["speed"]
+            entry["samples"] += 1
+            self._speeds[key] = entry
+
+    def save(self):
+        try:
+            with self._lock:
+                snapshot = dict(self._speeds)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Hiba a sebesség előzmények mentésekor: {e}")
+
+
+# --- Hátralévő idő becslése az ütemező működésének szimulálásával ---
+class EtaEstimator:
+    def __init__(self, history, profile_name):
+        self.history = history
+        self.profile_name = profile_name
+
+    # Csak a kódolás és az előszűrés szerinti átcsomagolás számít; az utóellenőrzés miatt átcsomagolt vagy
+    # másolt fájl (ACTION_REMUX/ORIGINAL, de már kódolt profillal) futásideje egyikre sem jellemző.
+    # A szakaszos feladat több munkaszál együttes áteresztése, nem egy szálkészleté, ezért az sem kerül be.
+    def record_job(self, job):
+        runtime = job.runtime()
+        if not job.duration_sec or not runtime or runtime <= 0 or job.segments:
+            return
+        if job.action not in (ACTION_ENCODE, ACTION_REMUX) or (job.action == ACTION_REMUX and job.profile is not None):
+            return
+        speed = job.duration_sec / runtime
+        for key in speed_keys(self.profile_name, _job_height(job), job.threads, job.action):
+            self.history.update(key, speed)
+
+    def job_speed(self, job, threads):
+        for key in speed_keys(self.profile_name, _job_height(job), threads, job.action):
+            speed = self.history.get(key)
+            if speed:
+                return speed
+        return None
+
+    def remaining_seconds(self, scheduler):
+        if scheduler.budget is None:
+            return None
+        jobs = scheduler.jobs
+        known = [job.duration_sec for job in jobs if job.duration_sec]
+        default_duration = sum(known) / len(known) if known else None
+        running = [job for job in jobs if job.status == STATUS_RUNNING]
+        queued = [job for job in jobs if job.status == STATUS_QUEUED]
+        # Előzmény hiányában a hasonló (kódoló vagy átcsomagoló) futó feladatok átlagos sebessége
+        fallback_speeds = {}
+        for action in (ACTION_ENCODE, ACTION_REMUX):
+            live_speeds = [job.speed for job in running if job.speed and job.action == action]
+            fallback_speeds[action] = sum(live_speeds) / len(live_speeds) if live_speeds else None
+        fallback_speeds[ACTION_REMUX] = fallback_speeds[ACTION_REMUX] or DEFAULT_REMUX_SPEED
+        default_threads = scheduler.budget.threads_for(0)
+
+        # Minden munkaszál mikor szabadul fel (másodperc múlva)
+        workers = []
+        for job in running:
+            duration = job.duration_sec or default_duration
+            speed = job.speed or self.job_speed(job, job.threads) or fallback_speeds.get(job.action)
+            if duration is None or not speed:
+                return None
+            workers.append(max(0.0, duration - job.encoded_sec) / speed)
+        workers += [0.0] * max(0, scheduler.num_workers - len(workers))
+        heapq.heapify(workers)
+
+        # A várakozók ugyanabban a sorrendben indulnak, mint az ütemezőben (leghosszabb elöl)
+        for job in sorted(queued, key=lambda j: -j.weight()):
+            duration = job.duration_sec or default_duration
+            speed = self.job_speed(job, default_threads) or fallback_speeds.get(job.action)
+            if duration is None or not speed:
+                return None
+            heapq.heappush(workers, heapq.heappop(workers) + duration / speed)
+        return max(workers) if workers else 0.0
+
+
+def _job_height(job):
+    return (job.metadata or {}).get("height")
@@ -0,0 +1,88 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = {
+    ".mp4", ".m4v", ".mov", ".mkv", ".avi", ".wmv", ".flv", ".webm", ".ts", ".mts", ".m2ts",
+    ".mpg", ".mpeg", ".3gp", ".dav", ".h264", ".264", ".h265", ".265"
+}
+DEFAULT_BATCH_SIZE = 500
+
+
+# --- Videófájl-e a kiterjesztés alapján ---
+def is_video_file(filename, extensions=VIDEO_EXTENSIONS):
+    return os.path.splitext(filename)[1].lower() in extensions
+
+
+# --- Könyvtár bejárása háttérszálon, kötegelt eredményközléssel ---
+class FileScanner:
+    def __init__(self, directory, on_batch, on_done, batch_size=DEFAULT_BATCH_SIZE, extensions=VIDEO_EXTENSIONS,
+                 index=None):
+        self.directory = directory
+        self.index = index
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.batch_size = max(1, int(batch_size))
+        self.extensions = extensions
+        self._cancelled = threading.Event()
+        self._thread = None
+        self.found = 0
+        self.started = None
+
+    def start(self):
+        self.started = time.time()
+        self._thread = threading.Thread(target=self._run, name="file-scan", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        error = None
+        try:
+            # A bejárás gyors, a rendezés miatt előbb összegyűjtjük, a lassú rész a sorok beszúrása
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if self._cancelled.is_set():
+                        break
+                    if not is_video_file(entry.name, self.extensions):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.name, entry.path, st.st_size, st.st_mtime))
+            entries.sort()
+            for start in range(0, len(entries), self.batch_size):
+                if self._cancelled.is_set():
+                    break
+                # Minden sor mellé kerül a már elkészült kimenet indexbejegyzése (vagy None)
+                batch = [(name, path, size, self.index.lookup(path, size, mtime) if self.index else None)
+                         for name, path, size, mtime in entries[start:start + self.batch_size]]
+                self.found += len(batch)
+                self.on_batch(batch)
+        except Exception as e:
+            logger.error(f"Hiba a mappa bejárásakor: {self.directory}: {e}")
+            error = str(e)
+        logger.info(f"Mappa bejárás befejezve: {self.directory} ({self.found} videófájl"
+                    f"{', megszakítva' if self._cancelled.is_set() else ''})")
+        try:
+            self.on_done(error)
+        except Exception as e:
+            logger.error(f"Hiba a bejárás befejezésének kezelésekor: {e}")
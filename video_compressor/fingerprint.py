@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .profiles import PROFILES
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE_NAME = "compressed_index.json"
+FINGERPRINT_CHUNK = 1024 * 1024
+INDEX_SAVE_INTERVAL = 20
+
+
+# --- Olcsó tartalmi ujjlenyomat: méret + az első és utolsó MB hash-e ---
+def compute_fingerprint(path, size):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_CHUNK))
+        if size > 2 * FINGERPRINT_CHUNK:
+            f.seek(size - FINGERPRINT_CHUNK)
+        digest.update(f.read(FINGERPRINT_CHUNK))
+    return f"{size}:{digest.hexdigest()}"
+
+
+# --- Már tömörített bemenetek indexe a kimeneti mappában ---
+# Az ismert (útvonal, méret, mtime) hármasnál nincs fájlolvasás; ismeretlen útvonalnál csak akkor
+# számolunk ujjlenyomatot, ha azonos méretű fájl már szerepel az indexben (átnevezett másolat).
+# A bejegyzés csak az azonos profillal (profile_name) készült kimenetre számít találatnak.
+class FingerprintIndex:
+    def __init__(self, directory, profile_name=None):
+        self.directory = directory
+        self.profile_name = profile_name
+        self.path = os.path.join(directory, INDEX_FILE_NAME)
+        self._outputs = {}
+        self._paths = {}
+        self._sizes = set()
+        self._dirty = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    self._outputs = data.get("outputs", {})
+                    self._paths = data.get("paths", {})
+                    self._sizes = {int(fp.split(":", 1)[0]) for fp in self._outputs}
+                    logger.info(f"Ujjlenyomat index betöltve: {self.path} ({len(self._outputs)} bejegyzés)")
+            except Exception as e:
+                logger.error(f"Hiba az ujjlenyomat index betöltésekor: {e}")
+                self._outputs, self._paths, self._sizes = {}, {}, set()
+
+    def lookup(self, path, size, mtime):
+        self._ensure_loaded()
+        with self._lock:
+            known = self._paths.get(path)
+            maybe_copy = size in self._sizes
+        if known and known["size"] == size and known["mtime"] == mtime:
+            fingerprint = known["fingerprint"]
+        elif maybe_copy:
+            try:
+                fingerprint = compute_fingerprint(path, size)
+            except OSError as e:
+                logger.warning(f"Ujjlenyomat nem számítható: {path}: {e}")
+                return None
+            with self._lock:
+                self._paths[path] = {"size": size, "mtime": mtime, "fingerprint": fingerprint}
+                self._dirty += 1
+        else:
+            return None
+        with self._lock:
+            entry = self._outputs.get(fingerprint)
+        if entry is None or not os.path.exists(entry["output"]):
+            return None
+        if not self._same_profile(entry):
+            logger.debug("Más profillal tömörítve (%s), újra sorra kerül: %s", entry.get("profile_name"), path)
+            return None
+        if entry["input"] != path:
+            logger.info(f"Már tömörített fájl másolata: {path} = {entry['input']}")
+        return entry
+
+    def add(self, path, size, mtime, output_path, output_size, profile):
+        self._ensure_loaded()
+        fingerprint = compute_fingerprint(path, size)
+        with self._lock:
+            self._paths[path] = {"size": size, "mtime": mtime, "fingerprint": fingerprint}
+            self._outputs[fingerprint] = {
+                "input": path,
+                "output": output_path,
+                "output_size": output_size,
+                "profile": profile,
+                "profile_name": self.profile_name,
+                "time": time.time()
+            }
+            self._sizes.add(size)
+            self._dirty += 1
+            save_now = self._dirty >= INDEX_SAVE_INTERVAL
+        if save_now:
+            self.save()
+
+    # Név nélküli (régebbi) bejegyzésnél a tárolt beállítások döntenek
+    def _same_profile(self, entry):
+        if self.profile_name is None:
+            return True
+        if "profile_name" in entry:
+            return entry["profile_name"] == self.profile_name
+        return entry.get("profile") == PROFILES.get(self.profile_name)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"outputs": dict(self._outputs), "paths": dict(self._paths)}
+            self._dirty = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Hiba az ujjlenyomat index mentésekor: {e}")
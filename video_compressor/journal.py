@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from .scheduler import STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED
+from .segments import remove_segments
+
+logger = logging.getLogger(__name__)
+
+
+# --- Hozzáfűzéses, fsync-elt feladatnapló a megszakadt kötegek folytatásához ---
+# Minden sor egy JSON rekord; a fájl visszajátszásakor fájlonként az utolsó rekord számít.
+class JobJournal:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record_queued(self, jobs, profile):
+        now = time.time()
+        self._append([{
+            "input": job.input_path,
+            "state": STATUS_QUEUED,
+            "output": job.output_path,
+            "size": job.size_bytes,
+            "profile": profile,
+            "time": now
+        } for job in jobs], sync=True)
+
+    def record_started(self, job):
+        # Az indulás elvesztése nem okoz kárt (a fájl újra sorra kerül), ezért nincs fsync
+        self._append([{
+            "input": job.input_path,
+            "state": STATUS_RUNNING,
+            "output": job.output_path,
+            "start": job.start_time,
+            "time": time.time()
+        }], sync=False)
+
+    def record_finished(self, job):
+        self._append([{
+            "input": job.input_path,
+            "state": job.status,
+            "output": job.output_path,
+            "size": job.size_bytes,
+            "output_size": job.output_size,
+            "start": job.start_time,
+            "end": job.end_time,
+            "runtime": job.runtime(),
+            "error": job.error,
+            "time": time.time()
+        }], sync=True)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def _append(self, records, sync):
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(data)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+
+# --- Napló visszajátszása: bemeneti útvonal -> utolsó állapot ---
+def replay_journal(path):
+    states = {}
+    if not os.path.exists(path):
+        return states
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Összeomláskor félbemaradt utolsó sor
+                continue
+            previous = states.get(record["input"], {})
+            previous.update(record)
+            states[record["input"]] = previous
+    return states
+
+
+# --- Visszaállítás induláskor: félkész kimenetek törlése, napló tömörítése ---
+def recover_journal(path):
+    states = replay_journal(path)
+    removed = 0
+    for record in states.values():
+        output = record.get("output")
+        if record["state"] == STATUS_RUNNING:
+            if output and os.path.exists(output):
+                try:
+                    os.remove(output)
+                    removed += 1
+                    logger.info(f"Félkész kimenet törölve: {output}")
+                except OSError as e:
+                    logger.error(f"Nem sikerült törölni a félkész kimenetet: {output}: {e}")
+            if output:
+                remove_segments(output)
+            record["state"] = STATUS_QUEUED
+        elif record["state"] == STATUS_DONE:
+            try:
+                valid = os.path.getsize(output) == record.get("output_size")
+            except (OSError, TypeError):
+                valid = False
+            if not valid:
+                logger.warning(f"Hiányzó vagy eltérő méretű kimenet, újra kell kódolni: {record['input']}")
+                record["state"] = STATUS_QUEUED
+
+    tmp_path = path + ".tmp"
+    if states or os.path.exists(path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in states.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    unfinished = sum(1 for r in states.values() if r["state"] in (STATUS_QUEUED, STATUS_FAILED))
+    logger.info(f"Feladatnapló visszajátszva: {len(states)} fájl, {unfinished} befejezetlen, {removed} félkész kimenet törölve")
+    return states
@@ -0,0 +1,60 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+LOG_FILE = "video_compressor.log"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(threadName)s - %(message)s'
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+DEFAULT_LOG_LEVEL = "INFO"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+_listener = None
+
+
+# --- Naplózás: a hívó szálak csak egy sorba tesznek, a fájlba/konzolra írás egy külön szálon történik ---
+# Így a kódoló és a Tk szál sosem vár a lemezre; a naplófájl méret szerint forog.
+def configure_logging(level=DEFAULT_LOG_LEVEL, log_file=LOG_FILE, stream=sys.stderr, max_bytes=LOG_MAX_BYTES,
+                      backup_count=LOG_BACKUP_COUNT):
+    global _listener
+    shutdown_logging()
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                            encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    if stream is not None:
+        stream_handler = logging.StreamHandler(stream)
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    set_log_level(level)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+# A szint a gyökér naplózón van, így a szint alatti hívások formázás nélkül azonnal visszatérnek
+def set_log_level(level):
+    if isinstance(level, str):
+        level = getattr(logging, level.upper(), logging.INFO)
+    logging.getLogger().setLevel(level)
+
+
+# A sorban maradt bejegyzések kiírása és az író szál leállítása
+def shutdown_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CACHE_SAVE_INTERVAL = 200
+DEFAULT_PROBE_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+
+# --- Egy fájl metaadatainak lekérdezése FFprobe-bal ---
+def probe_file(ffprobe_path, path, timeout=60):
+    cmd = [
+        ffprobe_path, "-v", "error", "-print_format", "json",
+        "-show_entries", "format=duration,bit_rate,size:stream=codec_type,codec_name,width,height,bit_rate,avg_frame_rate",
+        path
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", errors="replace").strip() or f"ffprobe hibakód: {result.returncode}")
+    data = json.loads(result.stdout.decode("utf-8", errors="replace") or "{}")
+    fmt = data.get("format", {})
+    meta = {
+        "duration": _to_float(fmt.get("duration")),
+        "bit_rate": _to_int(fmt.get("bit_rate")),
+        "size_bytes": _to_int(fmt.get("size")),
+        "video_codec": None,
+        "audio_codec": None,
+        "width": None,
+        "height": None,
+        "video_bit_rate": None,
+        "frame_rate": None
+    }
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and meta["video_codec"] is None:
+            meta["video_codec"] = stream.get("codec_name")
+            meta["width"] = stream.get("width")
+            meta["height"] = stream.get("height")
+            meta["video_bit_rate"] = _to_int(stream.get("bit_rate"))
+            meta["frame_rate"] = _parse_rate(stream.get("avg_frame_rate"))
+        elif stream.get("codec_type") == "audio" and meta["audio_codec"] is None:
+            meta["audio_codec"] = stream.get("codec_name")
+    return meta
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_rate(value):
+    try:
+        num, den = value.split("/")
+        return float(num) / float(den) if float(den) else None
+    except (AttributeError, ValueError):
+        return None
+
+
+# --- Lemezen tárolt metaadat gyorsítótár (útvonal, méret, mtime) kulccsal ---
+class MetadataCache:
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._dirty = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+                logger.info(f"Metaadat gyorsítótár betöltve: {len(self._entries)} bejegyzés")
+        except Exception as e:
+            logger.error(f"Hiba a metaadat gyorsítótár betöltésekor: {e}")
+            self._entries = {}
+
+    def get(self, path, size, mtime):
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry and entry.get("size") == size and entry.get("mtime") == mtime:
+            return entry.get("meta")
+        return None
+
+    def put(self, path, size, mtime, meta):
+        with self._lock:
+            self._entries[path] = {"size": size, "mtime": mtime, "meta": meta}
+            self._dirty += 1
+            save_now = self._dirty >= CACHE_SAVE_INTERVAL
+        if save_now:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._entries)
+            self._dirty = 0
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            logger.debug("Metaadat gyorsítótár mentve: %d bejegyzés", len(snapshot))
+        except Exception as e:
+            logger.error(f"Hiba a metaadat gyorsítótár mentésekor: {e}")
+
+
+# --- Párhuzamos háttér metaadat olvasó ---
+class MetadataScanner:
+    def __init__(self, ffprobe_path, cache, on_result, max_workers=DEFAULT_PROBE_WORKERS):
+        self.ffprobe_path = ffprobe_path
+        self.cache = cache
+        self.on_result = on_result
+        self.max_workers = max(1, int(max_workers))
+        self._cancelled = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self.total = 0
+        self.cache_hits = 0
+        self.probed = 0
+        self.started = None
+
+    def start(self, items):
+        self.started = time.time()
+        items = list(items)
+        self.total = len(items)
+        self._thread = threading.Thread(target=self._run, args=(items,), name="metadata-scan", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, items):
+        # A gyorsítótár találatok azonnal mennek, csak a hiányzó fájlok kerülnek a szálkészletbe
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ffprobe") as pool:
+            for key, path in items:
+                if self._cancelled.is_set():
+                    break
+                try:
+                    st = os.stat(path)
+                except OSError as e:
+                    self._deliver(key, path, None, str(e))
+                    continue
+                meta = self.cache.get(path, st.st_size, st.st_mtime) if self.cache else None
+                if meta is not None:
+                    self.cache_hits += 1
+                    self._deliver(key, path, meta, None)
+                else:
+                    pool.submit(self._probe, key, path, st.st_size, st.st_mtime)
+            if self._cancelled.is_set():
+                pool.shutdown(wait=False, cancel_futures=True)
+        if self.cache:
+            self.cache.save()
+        logger.info(f"Metaadat olvasás befejezve: {self.cache_hits} gyorsítótárból, {self.probed} FFprobe-bal")
+
+    def _probe(self, key, path, size, mtime):
+        if self._cancelled.is_set():
+            return
+        try:
+            meta = probe_file(self.ffprobe_path, path)
+            if meta.get("size_bytes") is None:
+                meta["size_bytes"] = size
+            with self._stats_lock:
+                self.probed += 1
+            if self.cache:
+                self.cache.put(path, size, mtime, meta)
+            self._deliver(key, path, meta, None)
+        except Exception as e:
+            logger.warning(f"FFprobe hiba: {path}: {e}")
+            self._deliver(key, path, None, str(e))
+
+    def _deliver(self, key, path, meta, error):
+        try:
+            self.on_result(key, path, meta, error)
+        except Exception as e:
+            logger.error(f"Hiba a metaadat eredmény kezelésekor: {e}")
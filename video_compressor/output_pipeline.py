@@ -0,0 +1,156 @@
+import logging
+import os
+import queue
+import shutil
+import threading
+from contextlib import nullcontext
+
+from .decision import ACTION_ENCODE, predict_bit_rate
+from .segments import validate_duration
+from .timing import STAGE_MOVE
+
+logger = logging.getLogger(__name__)
+
+MOVER_QUEUE_SIZE = 4
+# Ennyi szabad helynek mindig maradnia kell a várható kimenetek levonása után is
+MIN_FREE_BYTES = 512 * 1024 * 1024
+# A becsült kimeneti méret ráhagyása (a CRF alapú becslés csak közelítő)
+EXPECTED_SIZE_MARGIN = 1.25
+COPY_CHUNK = 8 * 1024 * 1024
+
+
+# --- Egy feladat várható kimeneti mérete (felső becslés) ---
+def expected_output_bytes(job, profile):
+    size = job.size_bytes or 0
+    if job.action != ACTION_ENCODE or not job.duration_sec:
+        return size
+    rate = predict_bit_rate(job.metadata or {}, job.profile or profile)
+    if not rate:
+        return size
+    predicted = int(rate * job.duration_sec / 8 * EXPECTED_SIZE_MARGIN)
+    # A forrásnál nagyobb kimenetet az utóellenőrzés úgyis eldobja
+    return min(size, predicted) if size else predicted
+
+
+def free_bytes(path):
+    # Még nem létező mappánál a legközelebbi létező szülő köteten mérünk
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return shutil.disk_usage(path).free
+
+
+# --- Szabad hely nyilvántartása: a futó feladatok várható kimenete előre le van foglalva ---
+class DiskSpaceGuard:
+    def __init__(self, min_free=MIN_FREE_BYTES):
+        self.min_free = min_free
+        self._reserved = {}
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    # Foglalás: {mappa: bájt}; False, ha bármelyik kötet a tartalék alá kerülne
+    def reserve(self, job, needs):
+        with self._lock:
+            for directory, amount in needs.items():
+                available = free_bytes(directory) - self._reserved.get(directory, 0) - amount
+                if available < self.min_free:
+                    return False
+            for directory, amount in needs.items():
+                self._reserved[directory] = self._reserved.get(directory, 0) + amount
+            self._jobs[job] = dict(needs)
+            return True
+
+    def release(self, job, directory=None):
+        with self._lock:
+            needs = self._jobs.get(job)
+            if not needs:
+                return
+            for key in ([directory] if directory else list(needs)):
+                amount = needs.pop(key, 0)
+                self._reserved[key] = self._reserved.get(key, 0) - amount
+            if not needs:
+                del self._jobs[job]
+
+    def in_flight(self):
+        with self._lock:
+            return bool(self._jobs)
+
+
+# --- Az elkészült kimenetek ellenőrzése és áthelyezése a célmappába egy külön szálon ---
+# A sor korlátos: ha a mozgatás (pl. hálózati meghajtóra) lemarad, a kódoló szálak a beadásnál várnak.
+class OutputMover:
+    def __init__(self, on_moved, ffprobe_path=None, max_pending=MOVER_QUEUE_SIZE, timings=None):
+        self.on_moved = on_moved
+        self.ffprobe_path = ffprobe_path
+        self.timings = timings
+        self._queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._thread = threading.Thread(target=self._run, name="output-mover", daemon=True)
+        self._thread.start()
+
+    def submit(self, job, final_path):
+        self._queue.put((job, final_path))
+
+    # Megvárja a sorban lévő áthelyezéseket és leállítja a szálat
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job, final_path = item
+            error = None
+            try:
+                with self.timings.span(job.input_path, STAGE_MOVE) if self.timings is not None else nullcontext():
+                    self._verify(job)
+                    move_file(job.output_path, final_path)
+                logger.info(f"Kimenet áthelyezve: {job.output_path} -> {final_path}")
+                job.output_path = final_path
+            except Exception as e:
+                logger.error(f"Hiba a kimenet áthelyezésekor: {job.output_path}: {e}")
+                error = str(e)
+                try:
+                    os.remove(job.output_path)
+                except OSError:
+                    pass
+            try:
+                self.on_moved(job, error)
+            except Exception as e:
+                logger.error(f"Hiba az áthelyezés befejezésének kezelésekor: {e}")
+
+    def _verify(self, job):
+        size = os.path.getsize(job.output_path)
+        if size == 0 or size != job.output_size:
+            raise RuntimeError(f"Hibás kimenet: {size} bájt (várt: {job.output_size})")
+        if self.ffprobe_path and job.duration_sec:
+            valid, actual = validate_duration(self.ffprobe_path, job.output_path, job.duration_sec)
+            if not valid:
+                raise RuntimeError(f"A kimenet hossza eltér: {actual} s (forrás: {job.duration_sec:.3f} s)")
+
+
+# --- Atomikus áthelyezés: azonos köteten átnevezés, egyébként másolás ideiglenes névre, majd átnevezés ---
+def move_file(source, destination):
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    try:
+        os.replace(source, destination)
+        return
+    except OSError:
+        pass
+    tmp_path = destination + ".part"
+    try:
+        with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.remove(source)
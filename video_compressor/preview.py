@@ -0,0 +1,221 @@
+import collections
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Bélyegkép sáv: ennyi, a felvétel mentén egyenletesen elosztott kulcskocka egymás mellett
+STRIP_TILES = 8
+STRIP_TILE_WIDTH = 160
+# Előnézeti klip: a felvétel mentén vett kulcskockák gyorsított lejátszása (60 kocka 6 fps-sel = 10 s)
+CLIP_FRAMES = 60
+CLIP_FPS = 6
+CLIP_WIDTH = 320
+CLIP_CRF = "30"
+PREVIEW_TIMEOUT = 300
+PREVIEW_WORKERS = 2
+# Futó kódolás mellett csak egy előnézet készül, hogy a fő sor ne lassuljon
+PREVIEW_WORKERS_WHILE_ENCODING = 1
+PREVIEW_NICE = 19
+STRIP_SUFFIX = "_strip.png"
+CLIP_SUFFIX = "_preview.mp4"
+
+
+# --- Bélyegkép sáv: bemenetenként gyors (kulcskockára) ugrás, csak kulcskocka dekódolása ---
+def build_strip_command(ffmpeg_path, input_path, output_path, duration=None, tiles=STRIP_TILES,
+                        width=STRIP_TILE_WIDTH):
+    points = [duration * (i + 0.5) / tiles for i in range(tiles)] if duration else [0.0]
+    cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error"]
+    for start in points:
+        cmd += ["-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{start:.3f}", "-i", input_path]
+    graph = ";".join(f"[{i}:v]scale={width}:-2,setsar=1[t{i}]" for i in range(len(points)))
+    if len(points) > 1:
+        graph += ";" + "".join(f"[t{i}]" for i in range(len(points))) + f"hstack=inputs={len(points)}[out]"
+    else:
+        graph = graph.replace("[t0]", "[out]")
+    return cmd + ["-filter_complex", graph, "-map", "[out]", "-frames:v", "1", output_path]
+
+
+# --- Előnézeti klip: csak a kulcskockák dekódolása, időarányos mintavétel, gyors preset, kis felbontás ---
+def build_clip_command(ffmpeg_path, input_path, output_path, duration=None, frames=CLIP_FRAMES, fps=CLIP_FPS,
+                       width=CLIP_WIDTH):
+    filters = [f"fps={frames / duration:.9g}"] if duration else []
+    filters += [f"scale={width}:-2", f"setpts=N/({fps}*TB)"]
+    return [ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+            "-skip_frame", "nokey", "-i", input_path, "-an", "-sn", "-vf", ",".join(filters), "-r", str(fps),
+            "-frames:v", str(frames), "-c:v", "libx264", "-preset", "ultrafast", "-crf", CLIP_CRF,
+            "-pix_fmt", "yuv420p", "-movflags", "+faststart", output_path]
+
+
+# --- Elkészült előnézetek a beállítások mellett; a kulcs a forrás útvonala, mérete és mtime-ja ---
+class PreviewCache:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def paths(self, input_path):
+        st = os.stat(input_path)
+        key = hashlib.sha1(f"{os.path.abspath(input_path)}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + STRIP_SUFFIX, base + CLIP_SUFFIX
+
+    # {"strip": ..., "clip": ...}, ha mindkettő elkészült, egyébként None
+    def lookup(self, input_path):
+        try:
+            strip_path, clip_path = self.paths(input_path)
+        except OSError:
+            return None
+        if os.path.exists(strip_path) and os.path.exists(clip_path):
+            return {"strip": strip_path, "clip": clip_path}
+        return None
+
+
+# --- Alacsony prioritású (nice/ionice) háttér készlet az előnézetekhez ---
+# A kérések sorban várnak; a felhasználó által megnyitott sor előre kerül. Kódolás közben kevesebb szál dolgozik.
+class PreviewGenerator:
+    def __init__(self, ffmpeg_path, cache, on_done=None, workers=PREVIEW_WORKERS):
+        self.ffmpeg_path = ffmpeg_path
+        self.cache = cache
+        self.on_done = on_done
+        self.workers = max(1, int(workers))
+        self._pending = collections.deque()
+        self._queued = {}
+        self._active = 0
+        self._throttled = False
+        self._closed = False
+        self._processes = set()
+        self._cond = threading.Condition()
+        self._ionice = shutil.which("ionice") if os.name == "posix" else None
+        self._nice = shutil.which("nice") if os.name == "posix" else None
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"preview-{i + 1}", daemon=True).start()
+
+    # key: a hívó azonosítója (pl. Treeview sor); gyorsítótár találatnál az eredmény azonnal visszajön
+    def request(self, key, input_path, duration=None, urgent=False):
+        cached = self.cache.lookup(input_path)
+        if cached is not None:
+            self._notify(key, input_path, cached, None)
+            return
+        with self._cond:
+            if input_path in self._queued:
+                # Már készül, vagy sürgős kérés nélkül a helyén marad a sorban
+                waiting = [entry for entry in self._pending if entry[1] == input_path]
+                if not urgent or not waiting:
+                    return
+                self._pending.remove(waiting[0])
+            self._queued[input_path] = key
+            entry = (key, input_path, duration)
+            if urgent:
+                self._pending.appendleft(entry)
+            else:
+                self._pending.append(entry)
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending) + self._active
+
+    # Megvárja, amíg a sor kiürül és minden futó előnézet elkészül
+    def wait(self, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: self._closed or not (self._pending or self._active), timeout)
+
+    # Futó kódolás alatt a készlet visszavesz a párhuzamosságból
+    def throttle(self, active):
+        with self._cond:
+            self._throttled = active
+            self._cond.notify_all()
+
+    def cancel_pending(self):
+        with self._cond:
+            for _, input_path, _ in self._pending:
+                self._queued.pop(input_path, None)
+            self._pending.clear()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            processes = list(self._processes)
+            self._cond.notify_all()
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+
+    def _limit(self):
+        return min(self.workers, PREVIEW_WORKERS_WHILE_ENCODING) if self._throttled else self.workers
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._pending or self._active >= self._limit()):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key, input_path, duration = self._pending.popleft()
+                self._active += 1
+            result = error = None
+            try:
+                result = self.generate(input_path, duration)
+            except Exception as e:
+                logger.error(f"Hiba az előnézet készítésekor: {input_path}: {e}")
+                error = str(e)
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._queued.pop(input_path, None)
+                    self._cond.notify_all()
+            if not self._closed:
+                self._notify(key, input_path, result, error)
+
+    def generate(self, input_path, duration=None):
+        os.makedirs(self.cache.directory, exist_ok=True)
+        strip_path, clip_path = self.cache.paths(input_path)
+        if not os.path.exists(strip_path):
+            self._build(build_strip_command, input_path, strip_path, duration)
+        if not os.path.exists(clip_path):
+            self._build(build_clip_command, input_path, clip_path, duration)
+        logger.info(f"Előnézet kész: {input_path}")
+        return {"strip": strip_path, "clip": clip_path}
+
+    # Ideiglenes névre készül (a kiterjesztés marad, az FFmpeg ebből választ formátumot), majd átnevezés
+    def _build(self, builder, input_path, output_path, duration):
+        root, ext = os.path.splitext(output_path)
+        tmp_path = f"{root}.{threading.get_ident()}.tmp{ext}"
+        cmd = builder(self.ffmpeg_path, input_path, tmp_path, duration)
+        if self._ionice:
+            cmd = [self._ionice, "-c", "3"] + cmd
+        if self._nice:
+            cmd = [self._nice, "-n", str(PREVIEW_NICE)] + cmd
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   creationflags=getattr(subprocess, "IDLE_PRIORITY_CLASS", 0))
+        with self._cond:
+            self._processes.add(process)
+        try:
+            _, stderr = process.communicate(timeout=PREVIEW_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RuntimeError(f"Az előnézet készítése túllépte az időkorlátot ({PREVIEW_TIMEOUT} s)")
+        finally:
+            with self._cond:
+                self._processes.discard(process)
+        if process.returncode != 0 or not os.path.exists(tmp_path):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            message = stderr.decode("utf-8", errors="replace").strip()[-500:]
+            raise RuntimeError(message or f"ffmpeg hibakód: {process.returncode}")
+        os.replace(tmp_path, output_path)
+
+    def _notify(self, key, input_path, result, error):
+        if self.on_done is None:
+            return
+        try:
+            self.on_done(key, input_path, result, error)
+        except Exception as e:
+            logger.error(f"Hiba az előnézet eredményének kezelésekor: {e}")
@@ -0,0 +1,71 @@
+import os
+
+# --- Tömörítési profilok ---
+PROFILES = {
+    "Alacsony": {"crf": "28", "preset": "fast"},
+    "Közepes": {"crf": "23", "preset": "medium"},
+    "Magas": {"crf": "18", "preset": "slow"},
+    # Fájlonként mintavétellel választott CRF/preset (autotune); a megadott értékek csak tartalékként szolgálnak
+    "Auto": {"crf": "23", "preset": "medium", "auto": True}
+}
+
+OUTPUT_EXTENSION = ".mp4"
+
+
+# --- Kimeneti útvonal képzése ---
+# taken: a kötegben már kiosztott kimenetek (normalizált útvonalak); azonos nevű, eltérő kiterjesztésű
+# bemeneteknél (cam.avi, cam.mkv) a későbbi a forrás kiterjesztését kapja (cam_mkv.mp4), szükség esetén sorszámot.
+def build_output_path(input_path, output_dir, taken=None):
+    stem, ext = os.path.splitext(os.path.basename(input_path))
+    candidates = [stem, f"{stem}_{ext.lstrip('.').lower()}"] if ext else [stem]
+    path = os.path.join(output_dir, candidates[0] + OUTPUT_EXTENSION)
+    if taken is None:
+        return path
+    counter = 2
+    while os.path.normcase(os.path.abspath(path)) in taken:
+        if len(candidates) > 1:
+            candidates.pop(0)
+            name = candidates[0]
+        else:
+            name = f"{candidates[0]}_{counter}"
+            counter += 1
+        path = os.path.join(output_dir, name + OUTPUT_EXTENSION)
+    taken.add(os.path.normcase(os.path.abspath(path)))
+    return path
+
+
+# --- FFmpeg parancs összeállítása ---
+def build_encode_command(ffmpeg_path, input_path, output_path, profile, threads=None, progress=False,
+                         start=None, end=None):
+    cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error"]
+    if progress:
+        cmd += ["-progress", "pipe:1", "-nostats"]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    # Szakasz kódolásakor a bemeneti oldali -ss kulcskockára ugrik, így a vágás pontos és gyors
+    if start:
+        cmd += ["-ss", f"{start:.6f}"]
+    cmd += ["-i", input_path]
+    if end is not None:
+        cmd += ["-t", f"{end - (start or 0.0):.6f}"]
+    cmd += [
+        "-c:v", "libx264", "-preset", profile["preset"], "-crf", str(profile["crf"]),
+        "-c:a", "aac", "-b:a", "128k"
+    ]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    cmd.append(output_path)
+    return cmd
+
+
+# --- Átcsomagolás MP4-be újrakódolás nélkül (stream copy) ---
+def build_remux_command(ffmpeg_path, input_path, output_path, video_codec=None, progress=False):
+    cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error"]
+    if progress:
+        cmd += ["-progress", "pipe:1", "-nostats"]
+    cmd += ["-i", input_path, "-map", "0:v:0", "-map", "0:a?", "-c", "copy"]
+    if video_codec == "hevc":
+        # Az Apple lejátszók csak hvc1 jelöléssel ismerik fel a HEVC-t MP4-ben
+        cmd += ["-tag:v", "hvc1"]
+    cmd += ["-movflags", "+faststart", output_path]
+    return cmd
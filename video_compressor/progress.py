@@ -0,0 +1,54 @@
+# --- FFmpeg "-progress" kimenet soronkénti feldolgozása ---
+# Az FFmpeg kulcs=érték sorokat ír, egy blokkot a "progress=continue|end" sor zár le.
+class ProgressParser:
+    def __init__(self):
+        self._block = {}
+
+    def feed(self, line):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+        self._block[key] = value.strip()
+        if key != "progress":
+            return None
+        block, self._block = self._block, {}
+        return {
+            "out_time_sec": _parse_out_time(block),
+            "frame": _to_int(block.get("frame")),
+            "fps": _to_float(block.get("fps")),
+            "speed": _to_float(block.get("speed", "").rstrip("x")),
+            "total_size": _to_int(block.get("total_size")),
+            "finished": value.strip() == "end"
+        }
+
+
+def _parse_out_time(block):
+    # Az out_time_ms a régi FFmpeg verziókban is mikroszekundumot tartalmaz
+    for key in ("out_time_us", "out_time_ms"):
+        value = _to_int(block.get(key))
+        if value is not None and value >= 0:
+            return value / 1000000.0
+    text = block.get("out_time")
+    if text and text != "N/A":
+        try:
+            hours, minutes, seconds = text.split(":")
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        except ValueError:
+            return None
+    return None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
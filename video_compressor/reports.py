@@ -0,0 +1,278 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from .decision import ACTION_LABELS
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+try:
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+except ImportError:
+    canvas = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXCEL = "excel"
+FORMAT_PDF = "pdf"
+FORMAT_TXT = "txt"
+FORMAT_JSON = "json"
+REPORT_FORMATS = (FORMAT_EXCEL, FORMAT_PDF, FORMAT_TXT, FORMAT_JSON)
+REPORT_EXTENSIONS = {FORMAT_EXCEL: ".xlsx", FORMAT_PDF: ".pdf", FORMAT_TXT: ".txt", FORMAT_JSON: ".jsonl"}
+
+# Oszlopok a Treeview sorrendjében: (fejléc, mezőnév, TXT szélesség)
+REPORT_COLUMNS = (
+    ("Fájlnév", "input", 40),
+    ("Bemenet (MB)", "input_mb", 12),
+    ("Időtartam", "duration", 10),
+    ("Kimenet", "output", 40),
+    ("Méret", "output_mb", 10),
+    ("Tömörítés", "ratio", 10),
+    ("Kezdő Idő", "start", 19),
+    ("Végző Idő", "end", 19),
+    ("Futásidő", "runtime", 10),
+    ("Státusz", "status", 12),
+    ("Típus", "action", 12)
+)
+# A PDF-ben csak a rövidebb oszlopok férnek el, a fájlnevek vágva jelennek meg
+PDF_COLUMN_WIDTHS = (180, 55, 50, 180, 45, 50, 45, 45, 50, 50, 60)
+PDF_ROW_HEIGHT = 14
+PDF_FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf"
+)
+
+
+def format_hms(seconds):
+    hours, rem = divmod(seconds, 3600)
+    minutes, seconds = divmod(rem, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
+
+
+def _format_time(timestamp):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp)) if timestamp else "-"
+
+
+# --- Egy befejezett feladat jelentéssora (a Treeview oszlopainak megfelelően) ---
+def job_row(job, status_labels=None):
+    output_size = job.output_size
+    return {
+        "input": os.path.basename(job.input_path),
+        "input_path": job.input_path,
+        "input_mb": round(job.size_bytes / (1024 * 1024), 1) if job.size_bytes is not None else None,
+        "duration_sec": job.duration_sec,
+        "duration": format_hms(job.duration_sec) if job.duration_sec else "-",
+        "output": os.path.basename(job.output_path) if output_size is not None else "-",
+        "output_path": job.output_path,
+        "output_mb": round(output_size / (1024 * 1024), 1) if output_size is not None else None,
+        "ratio": f"{100.0 * output_size / job.size_bytes:.1f}%" if output_size is not None and job.size_bytes else "-",
+        "start": _format_time(job.start_time),
+        "end": _format_time(job.end_time),
+        "runtime_sec": round(job.runtime(), 3) if job.start_time else None,
+        "runtime": format_hms(job.runtime()) if job.start_time else "-",
+        "status": (status_labels or {}).get(job.status, job.status),
+        "action": ACTION_LABELS.get(job.action, job.action),
+        "note": job.note,
+        "error": job.error
+    }
+
+
+def _cell(row, field):
+    value = row.get(field)
+    return "-" if value is None else value
+
+
+# --- Kötegenkénti jelentés, soronként írva ahogy a feladatok befejeződnek ---
+# A JSON Lines és a TXT fájl minden sor után ki van ürítve, így összeomláskor is használható részjelentés marad;
+# az Excel író módú munkafüzetbe kerül (a sorok nem maradnak a memóriában), a PDF a végén készül a sorfájlból.
+class ReportWriter:
+    def __init__(self, directory, formats, name=None, status_labels=None):
+        self.directory = directory
+        self.status_labels = status_labels
+        self.name = name or time.strftime("tomorites_%Y%m%d_%H%M%S")
+        self.paths = {}
+        self.rows = 0
+        self._lock = threading.Lock()
+        self._json_file = None
+        self._txt_file = None
+        self._workbook = None
+        self._sheet = None
+        self._spool_path = None
+        self._pdf = False
+        os.makedirs(directory, exist_ok=True)
+        for fmt in formats:
+            try:
+                self._open(fmt)
+            except Exception as e:
+                logger.error(f"Nem sikerült megnyitni a(z) {fmt} jelentést: {e}")
+
+    def _path(self, fmt):
+        path = os.path.join(self.directory, self.name + REPORT_EXTENSIONS[fmt])
+        self.paths[fmt] = path
+        return path
+
+    def _open(self, fmt):
+        if fmt == FORMAT_JSON:
+            self._json_file = open(self._path(fmt), "w", encoding="utf-8")
+        elif fmt == FORMAT_TXT:
+            self._txt_file = open(self._path(fmt), "w", encoding="utf-8")
+            self._txt_file.write(self._txt_line(dict((field, header) for header, field, _ in REPORT_COLUMNS)))
+            self._txt_file.write("-" * (sum(width + 1 for _, _, width in REPORT_COLUMNS) - 1) + "\n")
+            self._txt_file.flush()
+        elif fmt == FORMAT_EXCEL:
+            if Workbook is None:
+                raise RuntimeError("az openpyxl csomag nincs telepítve")
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet("Napló")
+            self._sheet.append([header for header, _, _ in REPORT_COLUMNS])
+            self._path(fmt)
+        elif fmt == FORMAT_PDF:
+            if canvas is None:
+                raise RuntimeError("a reportlab csomag nincs telepítve")
+            self._pdf = True
+            self._path(fmt)
+        else:
+            raise ValueError(f"ismeretlen formátum: {fmt}")
+
+    def _txt_line(self, row):
+        cells = []
+        for _, field, width in REPORT_COLUMNS:
+            text = str(_cell(row, field))
+            cells.append(text[:width].ljust(width))
+        return " ".join(cells).rstrip() + "\n"
+
+    def write_job(self, job):
+        self.write_row(job_row(job, self.status_labels))
+
+    def write_row(self, row):
+        line = json.dumps(row, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.rows += 1
+            if self._json_file is not None:
+                self._json_file.write(line)
+                self._json_file.flush()
+            elif self._pdf:
+                # JSON jelentés nélkül a PDF sorai egy ideiglenes sorfájlba kerülnek
+                if self._spool_path is None:
+                    fd, self._spool_path = tempfile.mkstemp(prefix="report_", suffix=".jsonl")
+                    os.close(fd)
+                with open(self._spool_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            if self._txt_file is not None:
+                self._txt_file.write(self._txt_line(row))
+                self._txt_file.flush()
+            if self._sheet is not None:
+                self._sheet.append([_cell(row, field) for _, field, _ in REPORT_COLUMNS])
+
+    def close(self, summary=None):
+        with self._lock:
+            if self._json_file is not None:
+                if summary is not None:
+                    self._json_file.write(json.dumps({"summary": summary}, ensure_ascii=False) + "\n")
+                self._json_file.close()
+            if self._txt_file is not None:
+                if summary is not None:
+                    self._txt_file.write("\n" + ", ".join(f"{key}: {value}" for key, value in summary.items()) + "\n")
+                self._txt_file.close()
+            if self._workbook is not None:
+                try:
+                    self._workbook.save(self.paths[FORMAT_EXCEL])
+                except Exception as e:
+                    logger.error(f"Hiba az Excel jelentés mentésekor: {e}")
+            if self._pdf:
+                source = self._spool_path or self.paths.get(FORMAT_JSON)
+                try:
+                    render_pdf(source, self.paths[FORMAT_PDF], title=self.name, summary=summary)
+                except Exception as e:
+                    logger.error(f"Hiba a PDF jelentés készítésekor: {e}")
+            if self._spool_path is not None:
+                os.remove(self._spool_path)
+            self._json_file = self._txt_file = self._workbook = self._sheet = self._spool_path = None
+            self._pdf = False
+        logger.info(f"Jelentés elkészült ({self.rows} sor): {', '.join(self.paths.values())}")
+
+
+def _iter_rows(path):
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if "summary" not in row:
+                yield row
+
+
+def _pdf_font():
+    for path in PDF_FONT_CANDIDATES:
+        if os.path.exists(path):
+            try:
+                pdfmetrics.registerFont(TTFont("ReportFont", path))
+                return "ReportFont"
+            except Exception:
+                continue
+    return "Helvetica"
+
+
+def _fit(pdf, text, font, size, width):
+    while text and pdf.stringWidth(text, font, size) > width - 4:
+        text = text[:-1]
+    return text
+
+
+# --- PDF: a sorfájl oldalanként kerül kirajzolásra, a teljes táblázat nem épül fel a memóriában ---
+def render_pdf(rows_path, pdf_path, title="", summary=None):
+    font = _pdf_font()
+    page_width, page_height = landscape(A4)
+    margin = 30
+    pdf = canvas.Canvas(pdf_path, pagesize=(page_width, page_height))
+    pdf.setTitle(title)
+
+    def header():
+        pdf.setFont(font, 12)
+        pdf.drawString(margin, page_height - margin, title)
+        pdf.setFont(font, 7)
+        x = margin
+        y = page_height - margin - 2 * PDF_ROW_HEIGHT
+        for (heading, _, _), width in zip(REPORT_COLUMNS, PDF_COLUMN_WIDTHS):
+            pdf.drawString(x, y, _fit(pdf, heading, font, 7, width))
+            x += width
+        pdf.line(margin, y - 4, page_width - margin, y - 4)
+        return y - PDF_ROW_HEIGHT
+
+    y = header()
+    for row in _iter_rows(rows_path):
+        if y < margin:
+            pdf.showPage()
+            y = header()
+        pdf.setFont(font, 7)
+        x = margin
+        for (_, field, _), width in zip(REPORT_COLUMNS, PDF_COLUMN_WIDTHS):
+            pdf.drawString(x, y, _fit(pdf, str(_cell(row, field)), font, 7, width))
+            x += width
+        y -= PDF_ROW_HEIGHT
+    if summary:
+        if y < margin + PDF_ROW_HEIGHT:
+            pdf.showPage()
+            y = page_height - margin
+        pdf.setFont(font, 9)
+        pdf.drawString(margin, y - PDF_ROW_HEIGHT,
+                       ", ".join(f"{key}: {value}" for key, value in summary.items()))
+    pdf.save()
+
+
+# --- A beállításokban bekapcsolt formátumok ---
+def enabled_formats(settings):
+    return [fmt for fmt in REPORT_FORMATS if settings.get(f"{fmt}_log")]
@@ -0,0 +1,845 @@
+import heapq
+import itertools
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+
+from .cpu_budget import affinity_prefix, pin_process, plan_thread_budget
+from .decision import (
+    ACTION_ENCODE, ACTION_REMUX, ACTION_SKIP, ACTION_ORIGINAL, PASSTHROUGH_OFF, can_remux, decide, original_copy_path
+)
+from .output_pipeline import DiskSpaceGuard, OutputMover, expected_output_bytes
+from .profiles import build_encode_command, build_remux_command
+from .progress import ProgressParser
+from .timing import STAGE_AUTOTUNE, STAGE_CONCAT, STAGE_ENCODE, STAGE_QUEUE_WAIT
+from .work_share import CLAIM_DONE, CLAIM_OK, RECHECK_SEC
+from .segments import (
+    concat_segments, find_keyframe_splits, plan_segments, remove_segments, segment_count, segment_dir,
+    segment_output_path, validate_duration
+)
+
+logger = logging.getLogger(__name__)
+
+# --- Feladat állapotok ---
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+STATUS_CANCELLED = "cancelled"
+# Megjelenített (felület, jelentések) állapotnevek; a GUI és a parancssor közös
+STATUS_LABELS = {
+    STATUS_QUEUED: "Várakozik",
+    STATUS_RUNNING: "Folyamatban",
+    STATUS_DONE: "Kész",
+    STATUS_FAILED: "Hiba",
+    STATUS_SKIPPED: "Kész",
+    STATUS_CANCELLED: "Megszakítva"
+}
+
+# Megszakításkor ennyi másodpercet kap az FFmpeg a leállásra, utána kill
+CANCEL_KILL_TIMEOUT = 5.0
+# Helyhiány miatt várakozó indításnál ilyen gyakran mérjük újra a szabad helyet
+SPACE_RECHECK_SEC = 5.0
+# Segédfolyamatok (minták, összefűzés, átcsomagolás) időkorlátjának ellenőrzési gyakorisága
+TRACKED_POLL_SEC = 1.0
+
+# Feldolgozási sorrend: leghosszabb először (rövidebb teljes idő) vagy a felvétel időpontja szerint
+ORDER_SIZE = "size"
+ORDER_CHRONOLOGICAL = "chronological"
+
+# --- Ütemező események ---
+EVENT_JOB_STARTED = "job_started"
+EVENT_JOB_FINISHED = "job_finished"
+EVENT_BATCH_FINISHED = "batch_finished"
+
+
+# --- Egy fájl tömörítési feladata ---
+class EncodeJob:
+    def __init__(self, job_id, input_path, output_path, size_bytes=None, duration_sec=None, metadata=None):
+        self.job_id = job_id
+        self.input_path = input_path
+        self.output_path = output_path
+        self.size_bytes = size_bytes
+        self.duration_sec = duration_sec
+        self.metadata = metadata
+        self.threads = None
+        self.status = STATUS_QUEUED
+        self.start_time = None
+        self.end_time = None
+        self.output_size = None
+        self.returncode = None
+        self.error = None
+        self.paused_sec = 0.0
+        self.encoded_sec = 0.0
+        self.fps = None
+        self.speed = None
+        self.segments = None
+        self.segments_pending = 0
+        self.profile = None
+        self.action = ACTION_ENCODE
+        self.note = None
+        self.destination = None
+        self.recorded_at = None
+        self.queued_at = None
+
+    # A hosszabb (vagy nagyobb) fájl előbb indul, így csökken a köteg teljes ideje
+    def weight(self):
+        if self.duration_sec:
+            return float(self.duration_sec)
+        return float(self.size_bytes or 0)
+
+    # Elkészült hányad 0..1 között; ismeretlen időtartamnál csak a befejezés számít
+    def fraction(self):
+        if self.status in (STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED):
+            return 1.0
+        if self.status != STATUS_RUNNING or not self.duration_sec:
+            return 0.0
+        return min(1.0, self.encoded_sec / self.duration_sec)
+
+    # Futásidő a szünetben töltött idő nélkül
+    def runtime(self):
+        if self.start_time is None or self.end_time is None:
+            return None
+        return self.end_time - self.start_time - self.paused_sec
+
+
+# --- Egy hosszú felvétel kulcskockáknál vágott szakasza ---
+class SegmentTask:
+    def __init__(self, job, index, start, end, output_path):
+        self.job = job
+        self.index = index
+        self.start = start
+        self.end = end
+        self.output_path = output_path
+        self.status = STATUS_QUEUED
+        self.encoded_sec = 0.0
+        self.fps = None
+        self.speed = None
+
+    def weight(self):
+        end = self.end if self.end is not None else self.job.duration_sec
+        return max(0.0, end - self.start)
+
+
+def _owner(task):
+    return task.job if isinstance(task, SegmentTask) else task
+
+
+# --- Párhuzamos FFmpeg ütemező ---
+class JobScheduler:
+    def __init__(self, ffmpeg_path, profile, num_workers, on_event=None, auto_threads=False, pin_cpus=False,
+                 journal=None, index=None, ffprobe_path="ffprobe", segment_threshold_sec=None, autotuner=None,
+                 passthrough_mode=PASSTHROUGH_OFF, scratch_dir=None, order=ORDER_SIZE, timings=None,
+                 shared_queue=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.segment_threshold_sec = segment_threshold_sec
+        self.profile = profile
+        self.num_workers = max(1, int(num_workers))
+        self.on_event = on_event
+        self.auto_threads = auto_threads
+        self.pin_cpus = pin_cpus and hasattr(os, "sched_setaffinity")
+        self.budget = None
+        self.journal = journal
+        self.index = index
+        self.autotuner = autotuner
+        self.passthrough_mode = passthrough_mode
+        self.scratch_dir = scratch_dir or None
+        self.order = order
+        self.timings = timings
+        self.shared_queue = shared_queue
+        if shared_queue is not None:
+            shared_queue.on_lost = self._claim_lost
+        self.space = DiskSpaceGuard()
+        self.mover = None
+        self._pending = []
+        self._heap = []
+        # Közös feladatsornál a más gépen éppen futó fájlok; a sor kiürülése után újra sorra kerülnek
+        self._deferred = []
+        self._deferred_at = None
+        # Munkaszálon lévő (futó vagy éppen szakaszokra bontott) teljes feladatok; amíg van ilyen, a tétlen
+        # munkaszál nem lép ki, mert a bontás még szakaszokat tehet a sorba
+        self._active_jobs = 0
+        self._counter = itertools.count()
+        self._lock = threading.Condition()
+        self._processes = {}
+        self._paused = False
+        self._pause_started = None
+        self._draining = False
+        self._cancelled = False
+        self._coordinator = None
+        self.jobs = []
+
+    def add_job(self, job):
+        with self._lock:
+            self.jobs.append(job)
+            self._pending.append(job)
+
+    def start(self):
+        if self._coordinator is not None:
+            raise RuntimeError("Az ütemező már el lett indítva")
+        # Szakaszos módban egyetlen hosszú fájl is kiadhat munkát az összes munkaszálnak
+        pending_jobs = None if self.segment_threshold_sec else len(self._pending)
+        self.budget = plan_thread_budget(self.num_workers, self.profile.get("preset"), auto=self.auto_threads,
+                                         pending_jobs=pending_jobs)
+        self.num_workers = self.budget.num_jobs
+        logger.info(f"Szálkiosztás: {self.budget}")
+        self._coordinator = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._coordinator.start()
+
+    def wait(self, timeout=None):
+        if self._coordinator is not None:
+            self._coordinator.join(timeout)
+        return not self.is_running()
+
+    def is_running(self):
+        return self._coordinator is not None and self._coordinator.is_alive()
+
+    def is_paused(self):
+        return self._paused
+
+    def is_stopped(self):
+        return self._draining
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    # Szünet: a futó FFmpeg folyamatok felfüggesztése (SIGSTOP) és az indítások leállítása
+    def pause(self):
+        with self._lock:
+            if self._paused or self._cancelled:
+                return
+            self._paused = True
+            self._pause_started = time.time()
+            processes = list(self._processes.values())
+        if hasattr(signal, "SIGSTOP"):
+            for process in processes:
+                self._send_signal(process, signal.SIGSTOP)
+        else:
+            logger.warning("A futó FFmpeg folyamatok felfüggesztése nem támogatott, csak az új feladatok indítása szünetel")
+        logger.info(f"Feldolgozás szüneteltetve ({len(processes)} futó folyamat)")
+
+    def resume(self):
+        with self._lock:
+            if not self._paused:
+                return
+            self._paused = False
+            paused_for = time.time() - self._pause_started
+            for job in {_owner(task) for task in self._processes}:
+                job.paused_sec += paused_for
+            processes = list(self._processes.values())
+            self._lock.notify_all()
+        if hasattr(signal, "SIGCONT"):
+            for process in processes:
+                self._send_signal(process, signal.SIGCONT)
+        logger.info("Feldolgozás folytatva")
+
+    # Leállítás: a futó feladatok befejeződnek, a várakozók nem indulnak el
+    def stop(self):
+        with self._lock:
+            self._draining = True
+            # A már elkezdett felvételek hátralévő szakaszai a futó feladathoz tartoznak, ezek maradnak
+            self._heap = [entry for entry in self._heap if isinstance(entry[2], SegmentTask)]
+            heapq.heapify(self._heap)
+            self._lock.notify_all()
+        self.resume()
+        logger.info("Ütemező leállítása: a futó feladatok befejeződnek, a sor kiürítve")
+
+    # Megszakítás: a futó FFmpeg folyamatok leállítása, a félkész kimenetek törlése
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            dropped = [entry[2] for entry in self._heap if isinstance(entry[2], SegmentTask)]
+            self._heap.clear()
+            self._lock.notify_all()
+            processes = list(self._processes.values())
+        for task in dropped:
+            task.status = STATUS_CANCELLED
+            self._segment_finished(task)
+        self.resume()
+        for process in processes:
+            self._terminate(process)
+        if processes:
+            threading.Thread(target=self._kill_stragglers, args=(processes,), name="cancel", daemon=True).start()
+        logger.info(f"Ütemező megszakítva ({len(processes)} futó folyamat leállítva)")
+
+    def _kill_stragglers(self, processes):
+        deadline = time.time() + CANCEL_KILL_TIMEOUT
+        for process in processes:
+            try:
+                process.wait(max(0.0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Az FFmpeg nem állt le időben, kényszerített leállítás: PID {process.pid}")
+                process.kill()
+
+    def _send_signal(self, process, sig):
+        try:
+            process.send_signal(sig)
+        except OSError as e:
+            logger.debug("Jelzés küldése sikertelen (PID %s): %s", process.pid, e)
+
+    def _terminate(self, process):
+        try:
+            process.terminate()
+        except OSError as e:
+            logger.debug("Folyamat leállítása sikertelen (PID %s): %s", process.pid, e)
+
+    def running_jobs(self):
+        return [job for job in self.jobs if job.status == STATUS_RUNNING]
+
+    # Időtartammal súlyozott teljes készültség; az ismeretlen hosszú fájlok az átlagos hosszal számítanak
+    def overall_fraction(self):
+        if not self.jobs:
+            return 0.0
+        known = [job.duration_sec for job in self.jobs if job.duration_sec]
+        default_weight = sum(known) / len(known) if known else 1.0
+        total = done = 0.0
+        for job in self.jobs:
+            weight = job.duration_sec or default_weight
+            total += weight
+            done += weight * job.fraction()
+        return done / total if total else 0.0
+
+    def _run(self):
+        logger.info(f"Ütemező indítása: {len(self._pending)} feladat, {self.num_workers} szál")
+        # A méretek lekérdezése itt történik, hogy a hívó (GUI) szál ne blokkoljon
+        with self._lock:
+            pending, self._pending = self._pending, []
+        queued = []
+        for job in pending:
+            try:
+                st = os.stat(job.input_path)
+                job.size_bytes = st.st_size
+                entry = self.index.lookup(job.input_path, st.st_size, st.st_mtime) if self.index else None
+            except OSError:
+                job.size_bytes = job.size_bytes or 0
+                entry = None
+            if entry is not None:
+                self._skip(job, entry)
+                continue
+            # Előszűrés a metaadatok alapján: a már hatékonyan kódolt fájlok nem kerülnek újrakódolásra
+            job.action, job.note = decide(job.metadata, self.profile, self.passthrough_mode)
+            if job.action == ACTION_SKIP:
+                self._skip_unchanged(job)
+            else:
+                if job.action == ACTION_REMUX:
+                    logger.info(f"Átcsomagolás újrakódolás helyett: {job.input_path} ({job.note})")
+                if self.scratch_dir:
+                    # A kódolás a gyors helyi átmeneti mappába ír, a célmappába a mozgató szál viszi át
+                    job.destination = os.path.dirname(job.output_path)
+                    job.output_path = os.path.join(self.scratch_dir, os.path.basename(job.output_path))
+                queued.append(job)
+        pending = queued
+        self._write_journal("record_queued", pending, self.profile)
+        queued_at = time.time()
+        with self._lock:
+            for job in pending:
+                job.queued_at = queued_at
+                heapq.heappush(self._heap, (self._priority(job), next(self._counter), job))
+
+        if self.scratch_dir:
+            self.mover = OutputMover(self._moved, ffprobe_path=self.ffprobe_path, timings=self.timings)
+        workers = []
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker, args=(i,), name=f"encoder-{i + 1}", daemon=True)
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+        if self.mover is not None:
+            self.mover.close()
+        if self.index is not None:
+            self.index.save()
+        logger.info("Ütemező: minden feladat befejeződött")
+        self._emit(EVENT_BATCH_FINISHED, None)
+
+    # Időrendi módban az időbélyeg nélküli fájlok a végére kerülnek; a szakaszok mindig előrébb vannak
+    def _priority(self, job):
+        if self.order == ORDER_CHRONOLOGICAL:
+            return job.recorded_at if job.recorded_at is not None else float("inf")
+        return -job.weight()
+
+    def _next_job(self):
+        with self._lock:
+            while True:
+                while self._paused and not (self._cancelled or self._draining):
+                    self._lock.wait()
+                if not self._heap and self._deferred and not (self._cancelled or self._draining):
+                    delay = self._deferred_at + RECHECK_SEC - time.time()
+                    if delay > 0:
+                        self._lock.wait(delay)
+                        continue
+                    for job in self._deferred:
+                        heapq.heappush(self._heap, (self._priority(job), next(self._counter), job))
+                    self._deferred = []
+                if self._cancelled:
+                    return None
+                if not self._heap:
+                    if not self._active_jobs:
+                        return None
+                    self._lock.wait()
+                    continue
+                task = self._heap[0][2]
+                if isinstance(task, SegmentTask):
+                    return heapq.heappop(self._heap)[2]
+                if self._admit(task):
+                    self._active_jobs += 1
+                    return heapq.heappop(self._heap)[2]
+                if not self.space.in_flight():
+                    # Nincs futó feladat, amely helyet szabadítana fel: a fájl hibával zárul
+                    heapq.heappop(self._heap)
+                    task.status = STATUS_FAILED
+                    task.error = "Nincs elég szabad lemezterület"
+                    self._active_jobs += 1
+                    return task
+                self._lock.wait(SPACE_RECHECK_SEC)
+
+    # Indítás csak akkor, ha a várható kimenet után is marad szabad hely az írt és a cél köteten
+    def _admit(self, job):
+        expected = expected_output_bytes(job, self.profile)
+        work_dir = os.path.dirname(os.path.abspath(job.output_path))
+        # Szakaszos kódolásnál a szakaszok és az összefűzött kimenet egyszerre vannak a lemezen
+        needs = {work_dir: expected * (2 if self._should_segment(job) else 1)}
+        if job.destination:
+            needs[os.path.abspath(job.destination)] = expected
+        if self.space.reserve(job, needs):
+            return True
+        logger.warning(f"Kevés a szabad hely, a következő fájl várakozik: {job.input_path}")
+        return False
+
+    def _worker(self, worker_index):
+        while True:
+            task = self._next_job()
+            if task is None:
+                return
+            if isinstance(task, SegmentTask):
+                self._encode_segment(task, worker_index)
+                continue
+            try:
+                if task.status == STATUS_FAILED:
+                    self._finish_job(task)
+                elif not self._claim(task):
+                    continue
+                elif self._should_segment(task) and self._split(task):
+                    continue
+                else:
+                    self._encode(task, worker_index)
+            finally:
+                with self._lock:
+                    self._active_jobs -= 1
+                    self._lock.notify_all()
+
+    # Közös feladatsornál a fájlt csak az a gép kódolja, amelyik lefoglalta
+    def _claim(self, job):
+        if self.shared_queue is None:
+            return True
+        try:
+            state = self.shared_queue.claim(job.input_path)
+        except OSError as e:
+            job.status = STATUS_FAILED
+            job.error = f"Hiba a közös sor foglalásakor: {e}"
+            job.end_time = time.time()
+            self._complete_job(job)
+            return False
+        if state == CLAIM_OK:
+            return True
+        self.space.release(job)
+        if state == CLAIM_DONE:
+            job.status = STATUS_SKIPPED
+            job.note = "Másik gép már feldolgozta"
+            logger.info(f"Kihagyva, másik gép már feldolgozta: {job.input_path}")
+            self._write_journal("record_finished", job)
+            self._emit(EVENT_JOB_FINISHED, job)
+        else:
+            logger.debug("Másik gép dolgozik rajta, később újra: %s", job.input_path)
+            with self._lock:
+                if not self._deferred:
+                    self._deferred_at = time.time()
+                self._deferred.append(job)
+                self._lock.notify_all()
+        return False
+
+    # Más gép átvette a foglalást (pl. a lejárat alatt nem frissült): a fájl kódolása itt leáll,
+    # a kimenet nem kerül a helyére, az eredményt az új tulajdonos rögzíti
+    def _claim_lost(self, path):
+        with self._lock:
+            processes = [process for task, process in self._processes.items() if _owner(task).input_path == path]
+        logger.warning(f"A foglalás elveszett, a kódolás leáll: {path}")
+        for process in processes:
+            self._terminate(process)
+
+    # Csak elindított (tehát lefoglalt) feladatnál; az indítás előtt hibára futott fájlnak nincs foglalása
+    def _drop_lost_claim(self, job):
+        if (self.shared_queue is None or job.start_time is None or job.status == STATUS_CANCELLED
+                or self.shared_queue.holds(job.input_path)):
+            return False
+        job.status = STATUS_CANCELLED
+        job.error = None
+        job.note = "Másik gép átvette"
+        self._remove_partial_output(job)
+        return True
+
+    def _start_job(self, job):
+        job.status = STATUS_RUNNING
+        job.start_time = time.time()
+        if self.timings is not None and job.queued_at:
+            self.timings.record(job.input_path, STAGE_QUEUE_WAIT, job.queued_at, job.start_time)
+        self._emit(EVENT_JOB_STARTED, job)
+        self._write_journal("record_started", job)
+
+    def _finish_job(self, job):
+        job.end_time = time.time()
+        self._drop_lost_claim(job)
+        if job.status == STATUS_DONE and job.destination:
+            # Az átmeneti kimenetet a mozgató szál ellenőrzi és helyezi át, a befejezés utána történik
+            self.space.release(job, os.path.dirname(os.path.abspath(job.output_path)))
+            self.mover.submit(job, os.path.join(job.destination, os.path.basename(job.output_path)))
+            return
+        self._complete_job(job)
+
+    def _moved(self, job, error):
+        if error:
+            job.status = STATUS_FAILED
+            job.error = error
+        self._complete_job(job)
+
+    def _complete_job(self, job):
+        if job.status == STATUS_DONE:
+            self._update_index(job)
+            logger.info(f"Tömörítés kész: {job.input_path} ({job.runtime():.1f} s)")
+        elif job.status == STATUS_CANCELLED:
+            logger.info(f"Tömörítés megszakítva: {job.input_path}")
+        else:
+            logger.error(f"Tömörítés sikertelen: {job.input_path}: {job.error}")
+        if self.shared_queue is not None:
+            if job.status == STATUS_CANCELLED:
+                self.shared_queue.release(job.input_path)
+            else:
+                self.shared_queue.finish(job, final=job.status != STATUS_FAILED)
+        self._write_journal("record_finished", job)
+        self._emit(EVENT_JOB_FINISHED, job)
+        self.space.release(job)
+        with self._lock:
+            self._lock.notify_all()
+
+    def _encode(self, job, worker_index):
+        self._start_job(job)
+        cpus = self.budget.cpu_sets[worker_index]
+        job.threads = len(cpus)
+        try:
+            if job.action == ACTION_REMUX:
+                cmd = build_remux_command(self.ffmpeg_path, job.input_path, job.output_path,
+                                          video_codec=(job.metadata or {}).get("video_codec"), progress=True)
+            else:
+                cmd = build_encode_command(self.ffmpeg_path, job.input_path, job.output_path, self._job_profile(job),
+                                           threads=len(cpus), progress=True)
+            with self._span(job, STAGE_ENCODE):
+                returncode, error = self._run_ffmpeg(job, cmd, cpus)
+            job.returncode = returncode
+            if returncode == 0:
+                job.status = STATUS_DONE
+                job.output_size = os.path.getsize(job.output_path)
+                if job.action == ACTION_ENCODE:
+                    self._keep_smaller(job)
+            elif self._cancelled:
+                job.status = STATUS_CANCELLED
+                self._remove_partial_output(job)
+            else:
+                job.status = STATUS_FAILED
+                job.error = error
+        except Exception as e:
+            job.status = STATUS_FAILED
+            job.error = str(e)
+        self._finish_job(job)
+
+    # Egy FFmpeg folyamat futtatása a haladás olvasásával; visszatér: (kilépési kód, hibaüzenet)
+    def _run_ffmpeg(self, task, cmd, cpus):
+        logger.debug("FFmpeg parancs: %s", cmd)
+        os.makedirs(os.path.dirname(task.output_path) or ".", exist_ok=True)
+        # Az affinitást még az exec előtt kell beállítani, hogy az FFmpeg összes szála örökölje
+        prefix = affinity_prefix(cpus) if self.pin_cpus else []
+        error = None
+        # A hibakimenet fájlba megy, így a stdout folyamatos olvasása közben nem telhet be a cső
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(prefix + cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+            if self.pin_cpus and not prefix:
+                pin_process(process.pid, cpus)
+            self._register_process(task, process)
+            try:
+                self._read_progress(task, process)
+                process.wait()
+            finally:
+                with self._lock:
+                    self._processes.pop(task, None)
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                error = stderr_file.read().decode("utf-8", errors="replace").strip()[-500:]
+        return process.returncode, error
+
+    # Segédfolyamat a feladathoz regisztrálva, így a szünet és a megszakítás is eléri; visszatér:
+    # (kilépési kód, hibakimenet). A szünetben töltött idő nem számít bele az időkorlátba.
+    def _run_tracked(self, task, cmd, timeout=None):
+        if self._cancelled:
+            raise RuntimeError("A feldolgozás megszakítva")
+        logger.debug("FFmpeg parancs: %s", cmd)
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr_file)
+            self._register_process(task, process)
+            deadline = time.time() + timeout if timeout else None
+            try:
+                while True:
+                    try:
+                        process.wait(TRACKED_POLL_SEC)
+                        break
+                    except subprocess.TimeoutExpired:
+                        if deadline is None:
+                            continue
+                        if self._paused:
+                            deadline += TRACKED_POLL_SEC
+                        elif time.time() > deadline:
+                            process.kill()
+                            process.wait()
+                            raise
+            finally:
+                with self._lock:
+                    self._processes.pop(task, None)
+            stderr_file.seek(0)
+            return process.returncode, stderr_file.read().decode("utf-8", errors="replace")
+
+    # Automatikus profilnál a feladat saját CRF/preset beállítása; hiba esetén a profil alapértékei
+    def _job_profile(self, job):
+        if job.profile is None:
+            job.profile = self.profile
+            if self.autotuner is not None and self.profile.get("auto"):
+                try:
+                    with self._span(job, STAGE_AUTOTUNE):
+                        job.profile = self.autotuner.choose(job.input_path, job.duration_sec, job.metadata,
+                                                            threads=job.threads,
+                                                            run=lambda cmd, timeout: self._run_tracked(job, cmd, timeout))
+                except Exception as e:
+                    if not self._cancelled:
+                        logger.warning(f"Automatikus profil választás sikertelen, alapértékek: {job.input_path}: {e}")
+        return job.profile
+
+    # --- Szakaszos kódolás hosszú felvételekhez ---
+    def _should_segment(self, job):
+        return bool(self.segment_threshold_sec and job.action == ACTION_ENCODE and job.duration_sec and job.duration_sec > self.segment_threshold_sec
+                    and segment_count(job.duration_sec, self.num_workers) > 1)
+
+    # A felvétel kulcskockáknál vágott szakaszai visszakerülnek a sorba, így több mag dolgozhat rajta
+    def _split(self, job):
+        try:
+            splits = find_keyframe_splits(self.ffprobe_path, job.input_path, job.duration_sec,
+                                          segment_count(job.duration_sec, self.num_workers))
+        except Exception as e:
+            logger.warning(f"Kulcskockák keresése sikertelen, egyben kódolás: {job.input_path}: {e}")
+            return False
+        if not splits:
+            return False
+        job.segments = [SegmentTask(job, i, start, end, segment_output_path(job.output_path, i))
+                        for i, (start, end) in enumerate(plan_segments(splits))]
+        job.segments_pending = len(job.segments)
+        job.threads = self.budget.threads_for(0)
+        os.makedirs(segment_dir(job.output_path), exist_ok=True)
+        self._start_job(job)
+        # A minták kódolása a szakaszok előtt, hogy minden szakasz ugyanazt a beállítást kapja
+        self._job_profile(job)
+        logger.info(f"Szakaszos kódolás: {job.input_path} ({len(job.segments)} szakasz)")
+        with self._lock:
+            cancelled = self._cancelled
+            if not cancelled:
+                for task in job.segments:
+                    heapq.heappush(self._heap, (-task.weight(), next(self._counter), task))
+                self._lock.notify_all()
+        if cancelled:
+            for task in job.segments:
+                task.status = STATUS_CANCELLED
+                self._segment_finished(task)
+        return True
+
+    def _encode_segment(self, task, worker_index):
+        job = task.job
+        if job.error or self._cancelled or (self.shared_queue is not None and not self.shared_queue.holds(job.input_path)):
+            # A felvétel egy másik szakasza már hibára futott, vagy más gép vette át
+            task.status = STATUS_CANCELLED
+        else:
+            cpus = self.budget.cpu_sets[worker_index]
+            cmd = build_encode_command(self.ffmpeg_path, job.input_path, task.output_path, job.profile or self.profile,
+                                       threads=len(cpus), progress=True, start=task.start, end=task.end)
+            task.status = STATUS_RUNNING
+            try:
+                with self._span(job, STAGE_ENCODE):
+                    returncode, error = self._run_ffmpeg(task, cmd, cpus)
+                if returncode == 0:
+                    task.status = STATUS_DONE
+                    task.encoded_sec = task.weight()
+                elif self._cancelled:
+                    task.status = STATUS_CANCELLED
+                else:
+                    task.status = STATUS_FAILED
+                    job.error = f"{task.index}. szakasz: {error}"
+            except Exception as e:
+                task.status = STATUS_FAILED
+                job.error = f"{task.index}. szakasz: {e}"
+        self._segment_finished(task)
+
+    def _segment_finished(self, task):
+        job = task.job
+        with self._lock:
+            job.segments_pending -= 1
+            last = job.segments_pending == 0
+        if last:
+            self._finish_segmented(job)
+
+    # Az utolsó szakasz után: összefűzés, hosszellenőrzés, takarítás
+    def _finish_segmented(self, job):
+        statuses = {task.status for task in job.segments}
+        if statuses == {STATUS_DONE}:
+            try:
+                with self._span(job, STAGE_CONCAT):
+                    concat_segments(self.ffmpeg_path, [task.output_path for task in job.segments], job.output_path,
+                                    run=lambda cmd, timeout: self._run_tracked(job, cmd, timeout))
+                valid, actual = validate_duration(self.ffprobe_path, job.output_path, job.duration_sec)
+                if not valid:
+                    raise RuntimeError(f"Az összefűzött kimenet hossza eltér: {actual} s (forrás: {job.duration_sec:.3f} s)")
+                job.status = STATUS_DONE
+                job.output_size = os.path.getsize(job.output_path)
+                self._keep_smaller(job)
+            except Exception as e:
+                if self._cancelled:
+                    job.status = STATUS_CANCELLED
+                else:
+                    job.status = STATUS_FAILED
+                    job.error = str(e)
+                self._remove_partial_output(job)
+        elif STATUS_FAILED in statuses:
+            job.status = STATUS_FAILED
+        else:
+            job.status = STATUS_CANCELLED
+        remove_segments(job.output_path)
+        self._finish_job(job)
+
+    # Az indítás és a regisztráció közötti szünet/megszakítás kérést is érvényesíteni kell
+    def _register_process(self, task, process):
+        with self._lock:
+            self._processes[task] = process
+            paused = self._paused
+            cancelled = self._cancelled
+        if cancelled:
+            self._terminate(process)
+        elif paused and hasattr(signal, "SIGSTOP"):
+            self._send_signal(process, signal.SIGSTOP)
+
+    def _remove_partial_output(self, job):
+        try:
+            if os.path.exists(job.output_path):
+                os.remove(job.output_path)
+                logger.info(f"Félkész kimenet törölve: {job.output_path}")
+        except OSError as e:
+            logger.error(f"Nem sikerült törölni a félkész kimenetet: {job.output_path}: {e}")
+
+    # A haladás csak a feladat mezőibe kerül, a felület a saját ütemében olvassa ki
+    def _read_progress(self, task, process):
+        parser = ProgressParser()
+        for line in process.stdout:
+            snapshot = parser.feed(line)
+            if snapshot is None:
+                continue
+            if snapshot["out_time_sec"] is not None:
+                task.encoded_sec = snapshot["out_time_sec"]
+            task.fps = snapshot["fps"]
+            task.speed = snapshot["speed"]
+            if isinstance(task, SegmentTask):
+                # A felvétel haladása a szakaszok összege, sebessége a futó szakaszoké együtt
+                job = task.job
+                job.encoded_sec = sum(t.encoded_sec for t in job.segments)
+                speeds = [t.speed for t in job.segments if t.status == STATUS_RUNNING and t.speed]
+                job.speed = sum(speeds) if speeds else None
+                job.fps = sum(t.fps for t in job.segments if t.status == STATUS_RUNNING and t.fps) or None
+        process.stdout.close()
+
+    # Korábban (esetleg más néven) már tömörített bemenet
+    def _skip(self, job, entry):
+        job.status = STATUS_SKIPPED
+        job.output_path = entry["output"]
+        job.output_size = entry["output_size"]
+        logger.info(f"Kihagyva, már tömörítve: {job.input_path} -> {job.output_path}")
+        self._write_journal("record_finished", job)
+        self._emit(EVENT_JOB_FINISHED, job)
+
+    # Az előszűrés szerint nem érdemes újrakódolni; kimenet nem készül
+    def _skip_unchanged(self, job):
+        job.status = STATUS_SKIPPED
+        logger.info(f"Kihagyva, újrakódolás nem éri meg: {job.input_path} ({job.note})")
+        self._write_journal("record_finished", job)
+        self._emit(EVENT_JOB_FINISHED, job)
+
+    # Utóellenőrzés: a forrásnál nem kisebb kimenet helyett az eredeti marad (átcsomagolva vagy másolva).
+    # Megszakításkor nem készül másolat: a félkész kimenet törlődik, a feladat megszakítottként zárul.
+    def _keep_smaller(self, job):
+        if not job.size_bytes or job.output_size < job.size_bytes:
+            return
+        logger.info(f"A kimenet nem kisebb a forrásnál ({job.output_size} >= {job.size_bytes}), eredeti megtartása: "
+                    f"{job.input_path}")
+        os.remove(job.output_path)
+        metadata = job.metadata or {}
+        if can_remux(metadata):
+            cmd = build_remux_command(self.ffmpeg_path, job.input_path, job.output_path,
+                                      video_codec=metadata.get("video_codec"))
+            try:
+                returncode, _ = self._run_tracked(job, cmd)
+            except RuntimeError:
+                returncode = None
+            if returncode == 0:
+                job.action = ACTION_REMUX
+                job.output_size = os.path.getsize(job.output_path)
+                return
+            self._remove_partial_output(job)
+            if not self._cancelled:
+                logger.warning(f"Átcsomagolás sikertelen, az eredeti másolása: {job.input_path}")
+        if self._cancelled:
+            job.status = STATUS_CANCELLED
+            job.output_size = None
+            return
+        copy_path = original_copy_path(job.input_path, job.output_path)
+        if os.path.abspath(copy_path) != os.path.abspath(job.input_path):
+            shutil.copy2(job.input_path, copy_path)
+        job.output_path = copy_path
+        job.action = ACTION_ORIGINAL
+        job.output_size = os.path.getsize(copy_path)
+
+    def _update_index(self, job):
+        if self.index is None:
+            return
+        try:
+            st = os.stat(job.input_path)
+            self.index.add(job.input_path, st.st_size, st.st_mtime, job.output_path, job.output_size,
+                           job.profile or self.profile)
+        except Exception as e:
+            logger.error(f"Hiba az ujjlenyomat index frissítésekor: {e}")
+
+    def _write_journal(self, method, *args):
+        if self.journal is None:
+            return
+        try:
+            getattr(self.journal, method)(*args)
+        except Exception as e:
+            logger.error(f"Hiba a feladatnapló írásakor: {e}")
+
+    def _span(self, job, stage):
+        return self.timings.span(job.input_path, stage) if self.timings is not None else nullcontext()
+
+    def _emit(self, event, job):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(event, job)
+        except Exception as e:
+            logger.error(f"Hiba az ütemező esemény kezelésekor: {e}")
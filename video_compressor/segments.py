@@ -0,0 +1,99 @@
+import logging
+import os
+import shutil
+import subprocess
+
+from .metadata import probe_file
+
+logger = logging.getLogger(__name__)
+
+MIN_SEGMENT_SEC = 300
+KEYFRAME_SEARCH_WINDOW = 20
+SEGMENT_DIR_SUFFIX = ".segments"
+DURATION_TOLERANCE_SEC = 1.0
+DURATION_TOLERANCE_RATIO = 0.002
+
+
+# --- Hány részre érdemes vágni egy hosszú felvételt ---
+def segment_count(duration, num_workers):
+    return max(1, min(num_workers * 2, int(duration // MIN_SEGMENT_SEC)))
+
+
+# --- Kulcskockák keresése a célpontok körül (csak a kis ablakok kerülnek beolvasásra) ---
+def find_keyframe_splits(ffprobe_path, path, duration, count, timeout=120):
+    targets = [duration * i / count for i in range(1, count)]
+    if not targets:
+        return []
+    intervals = ",".join(f"{t:.3f}%+{KEYFRAME_SEARCH_WINDOW}" for t in targets)
+    cmd = [
+        ffprobe_path, "-v", "error", "-select_streams", "v:0", "-read_intervals", intervals,
+        "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", path
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", errors="replace").strip() or "ffprobe hiba")
+    keyframes = []
+    for line in result.stdout.decode("utf-8", errors="replace").splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" not in flags:
+            continue
+        try:
+            keyframes.append(float(pts_time))
+        except ValueError:
+            continue
+    keyframes.sort()
+
+    splits = []
+    for target in targets:
+        candidates = [k for k in keyframes if target <= k < target + KEYFRAME_SEARCH_WINDOW]
+        if candidates and (not splits or candidates[0] > splits[-1]) and candidates[0] < duration:
+            splits.append(candidates[0])
+    return splits
+
+
+# --- Vágási pontokból (kezdet, vég) szakaszok; az utolsó szakasz vége nyitott ---
+def plan_segments(splits):
+    bounds = [0.0] + list(splits)
+    return [(start, bounds[i + 1] if i + 1 < len(bounds) else None) for i, start in enumerate(bounds)]
+
+
+def segment_dir(output_path):
+    return output_path + SEGMENT_DIR_SUFFIX
+
+
+def segment_output_path(output_path, index):
+    return os.path.join(segment_dir(output_path), f"part_{index:04d}.mp4")
+
+
+# --- A szakaszok veszteségmentes összefűzése a concat demuxerrel ---
+# run: (cmd, timeout) -> (kilépési kód, hibakimenet); az ütemező ezzel regisztrálja a folyamatot
+def concat_segments(ffmpeg_path, segment_paths, output_path, timeout=None, run=None):
+    list_path = os.path.join(os.path.dirname(segment_paths[0]), "concat.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", "-movflags", "+faststart", output_path
+    ]
+    if run is not None:
+        returncode, error = run(cmd, timeout)
+    else:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout)
+        returncode, error = result.returncode, result.stderr.decode("utf-8", errors="replace")
+    if returncode != 0:
+        raise RuntimeError(error.strip()[-500:] or "concat hiba")
+
+
+# --- Az összefűzött kimenet hossza egyezik-e a forráséval ---
+def validate_duration(ffprobe_path, output_path, expected):
+    actual = probe_file(ffprobe_path, output_path).get("duration")
+    if actual is None:
+        return False, None
+    tolerance = max(DURATION_TOLERANCE_SEC, expected * DURATION_TOLERANCE_RATIO)
+    return abs(actual - expected) <= tolerance, actual
+
+
+def remove_segments(output_path):
+    shutil.rmtree(segment_dir(output_path), ignore_errors=True)
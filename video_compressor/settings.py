@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+
+from .profiles import PROFILES
+
+logger = logging.getLogger(__name__)
+
+# --- Állapotfájlok (a munkakönyvtárban, a beállítások mellett) ---
+SETTINGS_FILE = "settings.json"
+METADATA_CACHE_FILE = "metadata_cache.json"
+SPEED_HISTORY_FILE = "speed_history.json"
+JOURNAL_FILE = "job_journal.jsonl"
+AUTO_PROFILE_CACHE_FILE = "auto_profile_cache.json"
+PREVIEW_CACHE_DIR = "previews"
+
+DEFAULT_SETTINGS = {
+    "input_dir": "",
+    "output_dir": "",
+    "log_output_dir": "",
+    "scratch_dir": "",
+    "selected_profile_name": next(iter(PROFILES), ""),
+    "num_threads": 1,
+    "auto_threads": False,
+    "pin_cpus": False,
+    "segment_mode": False,
+    "segment_threshold_min": 60,
+    "passthrough_mode": "off",
+    "excel_log": True,
+    "pdf_log": False,
+    "txt_log": True,
+    "json_log": True,
+    "file_type_choice": "ch",
+    "log_level": "INFO",
+    "chronological_order": False,
+    "shared_queue_dir": "",
+    "node_id": "",
+    "ffmpeg_path": "ffmpeg",
+    "ffprobe_path": "ffprobe"
+}
+
+
+# --- Beállítások betöltése; a hiányzó kulcsok az alapértelmezett értéket kapják ---
+def load_settings(path=SETTINGS_FILE):
+    settings = dict(DEFAULT_SETTINGS)
+    if not os.path.exists(path):
+        logger.warning("Nincs mentett beállításfájl, alapértelmezett értékek használata")
+        return settings
+    with open(path, "r", encoding="utf-8") as f:
+        settings.update(json.load(f))
+    if settings["selected_profile_name"] not in PROFILES:
+        settings["selected_profile_name"] = DEFAULT_SETTINGS["selected_profile_name"]
+    return settings
+
+
+def save_settings(settings, path=SETTINGS_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=4)
@@ -0,0 +1,130 @@
+import bisect
+import calendar
+import os
+import re
+import time
+
+FILE_TYPE_CH = "ch"
+FILE_TYPE_OTHER = "other"
+
+# ch01_20240115223000.dav, opcionális záró időbélyeggel: ch01_20240115223000_20240115233000.dav
+# A csatornaszám és az elválasztó elmaradhat: ch_20240115223000.dav, ch0120240115223000.dav
+CH_PATTERN = re.compile(r"^(?P<channel>ch\d*)[_-]?(?P<start>\d{14})(?:[_-](?P<end>\d{14}))?", re.IGNORECASE)
+# [kamera_]YYYY_MMDD_HHMMSS, pl. kapu_2024_0115_223000.mp4
+OTHER_PATTERN = re.compile(r"^(?:(?P<channel>.*?)_)?(?P<year>\d{4})_(?P<md>\d{4})_(?P<hms>\d{6})")
+# Ennél kisebb eltérés két egymást követő felvétel között nem számít hézagnak/átfedésnek
+DEFAULT_TOLERANCE_SEC = 2.0
+INPUT_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+# A fájlnevekben helyi idő szerepel; a gmtime alapú átváltás elkerüli a nyári időszámítás kétértelműségét.
+# Szeletelés és egész konverzió a strptime helyett: százezres nagyságrendű fájlnévnél ez a lényeges költség.
+def _digits_to_epoch(digits):
+    year, month, day = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+    hour, minute, second = int(digits[8:10]), int(digits[10:12]), int(digits[12:14])
+    if not (1 <= month <= 12 and 1 <= day <= 31 and hour < 24 and minute < 60 and second < 60):
+        return None
+    return calendar.timegm((year, month, day, hour, minute, second, 0, 0, 0))
+
+
+# --- Fájlnév feldolgozása: (csatorna, kezdet, vég vagy None), vagy None, ha nem illeszkedik ---
+def parse_filename(name, file_type=FILE_TYPE_CH):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    if file_type == FILE_TYPE_CH:
+        match = CH_PATTERN.match(stem)
+        if match is None:
+            return None
+        start = _digits_to_epoch(match.group("start"))
+        end = _digits_to_epoch(match.group("end")) if match.group("end") else None
+        channel = match.group("channel").lower()
+    else:
+        match = OTHER_PATTERN.match(stem)
+        if match is None:
+            return None
+        start = _digits_to_epoch(match.group("year") + match.group("md") + match.group("hms"))
+        end = None
+        channel = match.group("channel") or ""
+    if start is None:
+        return None
+    return channel, start, end
+
+
+# --- Felhasználói időpont (helyi, a fájlnevekkel azonos skálán) ---
+def parse_time(text):
+    text = text.strip()
+    for fmt in INPUT_TIME_FORMATS:
+        try:
+            return calendar.timegm(time.strptime(text, fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"Érvénytelen időpont: {text} (várt formátum: ÉÉÉÉ-HH-NN ÓÓ:PP)")
+
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+
+
+# --- Rendezett időbélyeg index a betöltött fájlokhoz (fájlonkénti FFprobe nélkül) ---
+class TimestampIndex:
+    def __init__(self, file_type=FILE_TYPE_CH):
+        self.file_type = file_type
+        self._entries = []
+        self._starts = []
+        self._start_by_key = {}
+        self.unmatched = 0
+
+    # items: (kulcs, fájlnév) párok; a nem illeszkedő nevek kimaradnak az indexből
+    def build(self, items):
+        entries = []
+        unmatched = 0
+        for key, name in items:
+            parsed = parse_filename(name, self.file_type)
+            if parsed is None:
+                unmatched += 1
+                continue
+            channel, start, end = parsed
+            entries.append((start, channel, key, end))
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        self._entries = entries
+        self._starts = [entry[0] for entry in entries]
+        self._start_by_key = {entry[2]: entry[0] for entry in entries}
+        self.unmatched = unmatched
+        return self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def channels(self):
+        return sorted({entry[1] for entry in self._entries})
+
+    def start_of(self, key):
+        return self._start_by_key.get(key)
+
+    def ordered_keys(self):
+        return [entry[2] for entry in self._entries]
+
+    # Kezdési idő szerint [start, end) tartományba eső fájlok, opcionálisan csatornára szűrve
+    def select(self, start=None, end=None, channels=None):
+        lo = bisect.bisect_left(self._starts, start) if start is not None else 0
+        hi = bisect.bisect_left(self._starts, end) if end is not None else len(self._starts)
+        wanted = {channel.lower() for channel in channels} if channels else None
+        return [entry[2] for entry in self._entries[lo:hi] if wanted is None or entry[1].lower() in wanted]
+
+    # Hézagok és átfedések csatornánként; a vég a fájlnévből vagy a már ismert időtartamból jön
+    # Visszatér: [(csatorna, típus, előző kulcs, következő kulcs, eltérés mp)], típus: "gap" vagy "overlap"
+    def find_gaps(self, durations=None, tolerance=DEFAULT_TOLERANCE_SEC):
+        durations = durations or {}
+        last = {}
+        findings = []
+        for start, channel, key, end in self._entries:
+            if end is None and durations.get(key):
+                end = start + durations[key]
+            previous = last.get(channel)
+            if previous is not None and previous[1] is not None:
+                delta = start - previous[1]
+                if delta > tolerance:
+                    findings.append((channel, "gap", previous[0], key, delta))
+                elif delta < -tolerance:
+                    findings.append((channel, "overlap", previous[0], key, -delta))
+            last[channel] = (key, end)
+        return findings
@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+STAGE_SCAN = "scan"
+STAGE_PROBE = "probe"
+STAGE_QUEUE_WAIT = "queue_wait"
+STAGE_AUTOTUNE = "autotune"
+STAGE_ENCODE = "encode"
+STAGE_CONCAT = "concat"
+STAGE_MOVE = "move"
+STAGE_REPORT = "report"
+
+
+# --- Szakaszonkénti időmérés: hová megy el a köteg falióra-ideje ---
+# A mérések tömör sorokként (kulcs, szakasz, kezdet, időtartam) gyűlnek, így nagy kötegnél is kevés memóriát foglalnak.
+class SpanRecorder:
+    def __init__(self):
+        self.started = time.time()
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def record(self, key, stage, start, end):
+        with self._lock:
+            self._spans.append((key, stage, start, end - start))
+
+    @contextmanager
+    def span(self, key, stage):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(key, stage, start, time.time())
+
+    # Szakaszonként: darabszám, összes és leghosszabb idő
+    def summary(self):
+        totals = {}
+        with self._lock:
+            spans = list(self._spans)
+        for _, stage, _, duration in spans:
+            entry = totals.setdefault(stage, {"count": 0, "total_sec": 0.0, "max_sec": 0.0})
+            entry["count"] += 1
+            entry["total_sec"] += duration
+            entry["max_sec"] = max(entry["max_sec"], duration)
+        for entry in totals.values():
+            entry["total_sec"] = round(entry["total_sec"], 3)
+            entry["max_sec"] = round(entry["max_sec"], 3)
+        return totals
+
+    def export_json(self, path):
+        with self._lock:
+            spans = list(self._spans)
+        data = {
+            "started": self.started,
+            "wall_sec": round(time.time() - self.started, 3),
+            "summary": self.summary(),
+            "spans": [{"key": key, "stage": stage, "start": round(start, 3), "duration_sec": round(duration, 3)}
+                      for key, stage, start, duration in spans]
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"Időmérés mentve: {path} ({len(spans)} mérés)")
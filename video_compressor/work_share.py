@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+from .reports import job_row
+
+logger = logging.getLogger(__name__)
+
+CLAIMS_DIR = "claims"
+RESULTS_DIR = "results"
+CLAIM_SUFFIX = ".claim"
+RESULT_SUFFIX = ".json"
+# Ennyi idő frissítés nélkül után a foglalás gazdátlannak számít és más gép átveheti
+DEFAULT_LEASE_SEC = 120.0
+# A foglalt (más gépen futó) fájlok ilyen időközönként kerülnek újra sorra
+RECHECK_SEC = 15.0
+
+CLAIM_OK = "ok"
+CLAIM_BUSY = "busy"
+CLAIM_DONE = "done"
+
+
+def default_node_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# --- Több gép közös feladatsora egy megosztott mappában, külső szolgáltatás nélkül ---
+# Minden gép ugyanazt a bemeneti mappát járja be; egy fájlt az kódol, amelyik elsőként létrehozza a
+# foglalásfájlját (O_EXCL). A foglalást a tulajdonos rendszeresen frissíti (mtime); a lejárt foglalást
+# bármelyik gép átnevezéssel átveheti, így a leállt gép fájljai sem vesznek el.
+# Az eredményfájlok alapján a gépek kihagyják a máshol már elkészült fájlokat, és ezekből készül az
+# összesített állapot és jelentés.
+class SharedJobQueue:
+    def __init__(self, directory, input_root, node_id=None, lease_sec=DEFAULT_LEASE_SEC):
+        self.directory = directory
+        self.input_root = os.path.abspath(input_root)
+        self.node_id = node_id or default_node_id()
+        self.lease_sec = float(lease_sec)
+        self.claims_dir = os.path.join(directory, CLAIMS_DIR)
+        self.results_dir = os.path.join(directory, RESULTS_DIR)
+        self._clock_path = os.path.join(self.claims_dir, f".clock-{self.node_id}")
+        self._held = {}
+        # Hívás (bemeneti útvonal), ha egy tartott foglalást más gép átvett; az ütemező állítja be
+        self.on_lost = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        os.makedirs(self.claims_dir, exist_ok=True)
+        os.makedirs(self.results_dir, exist_ok=True)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._heartbeat, name="work-share", daemon=True)
+        self._thread.start()
+        logger.info(f"Közös feladatsor: {self.directory} (gép: {self.node_id}, foglalás: {self.lease_sec:.0f} s)")
+
+    # A még tartott foglalások feloldása (pl. megszakított kötegnél), hogy más gép azonnal átvehesse
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            held = list(self._held)
+        for path in held:
+            self.release(path)
+        try:
+            os.remove(self._clock_path)
+        except OSError:
+            pass
+
+    # A kulcs a bemeneti mappához viszonyított útvonalból és a fájl méretéből/mtime-jából készül,
+    # így eltérő csatolási pontú gépeken is azonos, a lecserélt fájl viszont újra sorra kerül.
+    def key(self, path):
+        st = os.stat(path)
+        relative = os.path.relpath(os.path.abspath(path), self.input_root).replace(os.sep, "/")
+        return hashlib.sha1(f"{relative}|{st.st_size}|{int(st.st_mtime)}".encode("utf-8")).hexdigest(), relative
+
+    def _claim_path(self, key):
+        return os.path.join(self.claims_dir, key + CLAIM_SUFFIX)
+
+    def _result_path(self, key):
+        return os.path.join(self.results_dir, key + RESULT_SUFFIX)
+
+    # A megosztott kötet szerinti idő (a gépek órái eltérhetnek): egy saját fájl frissített mtime-ja
+    def _now(self):
+        with open(self._clock_path, "a"):
+            os.utime(self._clock_path, None)
+        return os.stat(self._clock_path).st_mtime
+
+    # OSError (pl. elérhetetlen bemenet vagy megosztott mappa) a hívóhoz jut: ez hiba, nem foglaltság
+    def claim(self, path):
+        key, relative = self.key(path)
+        result = _read_json(self._result_path(key))
+        if result is not None and result.get("final"):
+            return CLAIM_DONE
+        claim_path = self._claim_path(key)
+        token = uuid.uuid4().hex
+        record = {"node": self.node_id, "token": token, "input": relative, "claimed_at": time.time()}
+        for _ in range(2):
+            try:
+                fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if self._take_over_stale(claim_path):
+                    continue
+                return CLAIM_BUSY
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            with self._lock:
+                self._held[path] = (key, relative, token)
+            return CLAIM_OK
+        return CLAIM_BUSY
+
+    # Lejárt foglalás átvétele: az átnevezés atomikus, így egyszerre csak egy gép nyerhet.
+    # Ha közben a tulajdonos frissítette, vagy más gép újra lefoglalta, visszakerül a helyére.
+    def _take_over_stale(self, claim_path):
+        try:
+            st = os.stat(claim_path)
+        except FileNotFoundError:
+            return True
+        if self._now() - st.st_mtime < self.lease_sec:
+            return False
+        seen = _read_json(claim_path) or {}
+        tomb = f"{claim_path}.{uuid.uuid4().hex}.stale"
+        try:
+            os.rename(claim_path, tomb)
+        except FileNotFoundError:
+            return False
+        current = _read_json(tomb) or {}
+        if current.get("token") != seen.get("token") or os.stat(tomb).st_mtime > st.st_mtime:
+            try:
+                os.link(tomb, claim_path)
+            except OSError:
+                pass
+            os.remove(tomb)
+            return False
+        os.remove(tomb)
+        logger.warning(f"Lejárt foglalás átvéve: {seen.get('input')} (gép: {seen.get('node')})")
+        return True
+
+    # Eredmény rögzítése és a foglalás feloldása; final=False (hiba) esetén más gép újra megpróbálhatja
+    def finish(self, job, final=True):
+        with self._lock:
+            held = self._held.get(job.input_path)
+        if held is None:
+            return
+        key, relative, _ = held
+        row = job_row(job)
+        row.update(node=self.node_id, input_rel=relative, final=final, finished_at=time.time())
+        try:
+            _write_json(self._result_path(key), row)
+        except OSError as e:
+            logger.error(f"Hiba a közös sor eredményfájl írásakor: {job.input_path}: {e}")
+        self.release(job.input_path)
+
+    def holds(self, path):
+        with self._lock:
+            return path in self._held
+
+    def release(self, path):
+        with self._lock:
+            held = self._held.pop(path, None)
+        if held is None:
+            return
+        key, _, token = held
+        claim_path = self._claim_path(key)
+        current = _read_json(claim_path)
+        if current is not None and current.get("token") == token:
+            try:
+                os.remove(claim_path)
+            except OSError as e:
+                logger.error(f"Hiba a foglalás feloldásakor: {path}: {e}")
+
+    # A tartott foglalások frissítése; az elvesztett (más gép által átvett) foglalás kikerül a listából
+    def _heartbeat(self):
+        interval = max(1.0, self.lease_sec / 4)
+        while not self._stop.wait(interval):
+            with self._lock:
+                held = list(self._held.items())
+            for path, (key, relative, token) in held:
+                claim_path = self._claim_path(key)
+                current = _read_json(claim_path)
+                if current is None or current.get("token") != token:
+                    logger.warning(f"A foglalás elveszett (más gép átvette): {relative}")
+                    with self._lock:
+                        self._held.pop(path, None)
+                    if self.on_lost is not None:
+                        self.on_lost(path)
+                    continue
+                try:
+                    os.utime(claim_path, None)
+                except OSError as e:
+                    logger.error(f"Hiba a foglalás frissítésekor: {relative}: {e}")
+
+    def results(self):
+        for entry in os.scandir(self.results_dir):
+            if entry.name.endswith(RESULT_SUFFIX):
+                row = _read_json(entry.path)
+                if row is not None:
+                    yield row
+
+    # Összesített állapot az összes gépről: eredmények gépenként/státuszonként, futó és lejárt foglalások
+    def status(self):
+        nodes = {}
+        totals = {}
+        for row in self.results():
+            node = nodes.setdefault(row.get("node"), {})
+            node[row["status"]] = node.get(row["status"], 0) + 1
+            totals[row["status"]] = totals.get(row["status"], 0) + 1
+        now = self._now()
+        claims = []
+        for entry in os.scandir(self.claims_dir):
+            if not entry.name.endswith(CLAIM_SUFFIX):
+                continue
+            record = _read_json(entry.path)
+            try:
+                age = now - entry.stat().st_mtime
+            except OSError:
+                continue
+            if record is not None:
+                claims.append({"node": record.get("node"), "input": record.get("input"),
+                               "since": record.get("claimed_at"), "stale": age >= self.lease_sec})
+        return {"results": totals, "nodes": nodes, "claims": claims}
+
+
+# --- Összesített jelentés az összes gép eredményfájljaiból ---
+def write_merged_report(queue, writer, status_labels=None):
+    rows = sorted(queue.results(), key=lambda row: row.get("finished_at") or 0)
+    for row in rows:
+        if status_labels:
+            row["status"] = status_labels.get(row["status"], row["status"])
+        writer.write_row(row)
+    return len(rows)